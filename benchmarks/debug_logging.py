@@ -0,0 +1,45 @@
+"""
+measures the cost of logging a large request at debug level while DEBUG is disabled, when the request
+is serialised eagerly, and when it is wrapped in a LazyJson.
+
+    python benchmarks/debug_logging.py
+"""
+import json
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cfn_resource_provider.log_payload import LazyJson  # noqa: E402
+
+log = logging.getLogger()
+log.setLevel(logging.INFO)
+
+request = {
+    "RequestType": "Create",
+    "ResourceType": "Custom::Resource",
+    "ResourceProperties": {"Property%d" % i: "value-%d-%s" % (i, "x" * 64) for i in range(2000)},
+}
+
+
+def eager():
+    log.debug("received request %s", json.dumps(request))
+
+
+def lazy():
+    log.debug("received request %s", LazyJson(request))
+
+
+def report(name, fn, number=200):
+    elapsed = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print("%-8s %10.2f us/request" % (name, elapsed * 1e6))
+    return elapsed
+
+
+if __name__ == "__main__":
+    print("payload  %10d bytes" % len(json.dumps(request)))
+    before = report("eager", eager)
+    after = report("lazy", lazy)
+    print("speedup  %10.0fx" % (before / after))
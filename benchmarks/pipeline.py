@@ -0,0 +1,190 @@
+"""
+measures the throughput and memory use of ResourceProvider.handle and SnsEnvelope.handle against a
+local ResponseURL stub, for small and very large properties, deeply nested properties and schemas
+with many default values. The results are written as JSON, by default to benchmarks/results/<revision>.json
+where revision is the `git describe` of the tree, so that they can be compared with those of a previous release:
+
+    python benchmarks/pipeline.py --compare benchmarks/results/1.2.1.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from uuid import uuid4
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+sys.path.insert(0, os.path.join(os.path.dirname(here), "tests"))
+
+from cfn_resource_provider import ResourceProvider, SnsEnvelope  # noqa: E402
+from response_server import ResponseServer  # noqa: E402
+
+
+def version():
+    with open(os.path.join(here, "..", "setup.py")) as f:
+        return re.search(r'^version = "([^"]+)"', f.read(), re.M).group(1)
+
+
+def revision():
+    """
+    returns the `git describe` of the working tree, or the current time if it is not a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--tags", "--always", "--dirty"], cwd=here, capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime("%Y%m%dT%H%M%S")
+
+
+def nested(depth):
+    schema, properties = {"type": "object", "properties": {"Value": {"type": "integer"}}}, {"Value": "1"}
+    for i in range(depth):
+        schema = {"type": "object", "properties": {"Child": schema, "Name": {"type": "string"}}}
+        properties = {"Child": properties, "Name": "level-%d" % i}
+    return schema, properties
+
+
+SCENARIOS = {
+    "small": (
+        {
+            "type": "object",
+            "required": ["Name"],
+            "properties": {
+                "Name": {"type": "string"},
+                "Length": {"type": "integer", "default": 30},
+                "Enabled": {"type": "boolean", "default": True},
+            },
+        },
+        {"Name": "bla", "Length": "12"},
+    ),
+    "large": (
+        {"type": "object", "additionalProperties": {"type": "string", "maxLength": 256}},
+        {"Property%d" % i: "value-%d-%s" % (i, "x" * 64) for i in range(2000)},
+    ),
+    "deep": nested(40),
+    "defaults": (
+        {
+            "type": "object",
+            "properties": {"Property%d" % i: {"type": "string", "default": "default-%d" % i} for i in range(200)},
+        },
+        {"Property0": "value"},
+    ),
+}
+
+
+def provider_class(name, schema):
+    class BenchmarkProvider(ResourceProvider):
+        def __init__(self):
+            super(BenchmarkProvider, self).__init__()
+            self.request_schema = schema
+
+        def convert_property_types(self):
+            self.schema_convert_property_types(self.properties)
+
+        def create(self):
+            self.physical_resource_id = "benchmark-%s" % name
+
+    BenchmarkProvider.__name__ = "%sProvider" % name.capitalize()
+    return BenchmarkProvider
+
+
+def request(url, name, properties):
+    return {
+        "RequestType": "Create",
+        "ResponseURL": url,
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": "Custom::%s" % name.capitalize(),
+        "LogicalResourceId": "Benchmark",
+        "ResourceProperties": properties,
+    }
+
+
+def measure(fn, min_time=0.5, repeat=3):
+    """
+    returns the best number of calls of `fn` per second, the peak traced memory of a call in bytes,
+    and the number of memory blocks still allocated after a call.
+    """
+    fn()
+    best = 0.0
+    for _ in range(repeat):
+        count, start = 0, time.perf_counter()
+        while True:
+            fn()
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, count / elapsed)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {"ops_per_sec": round(best, 1), "peak_bytes": peak, "retained_blocks": retained}
+
+
+def benchmarks(url, sns_records):
+    for name, (schema, properties) in SCENARIOS.items():
+        provider = provider_class(name, schema)
+        encoded = json.dumps(request(url, name, properties))
+        yield "handle/%s" % name, lambda: provider().handle(json.loads(encoded), {})
+
+        records = {"Records": [{"Sns": {"Message": encoded}} for _ in range(sns_records)]}
+        encoded_records = json.dumps(records)
+        yield "sns/%s" % name, lambda: SnsEnvelope(provider).handle(json.loads(encoded_records), {})
+
+
+def compare(results, baseline):
+    print("\ncompared to %s:" % baseline["version"])
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous:
+            change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+            print("%-18s %+7.1f%%%s" % (name, change * 100, "  <- regression" if change < -0.1 else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the request handling pipeline")
+    parser.add_argument("--output", default=os.path.join(here, "results", "%s.json" % revision()))
+    parser.add_argument("--force", action="store_true", help="overwrite the output if it exists")
+    parser.add_argument("--compare", help="results of a previous run to compare with")
+    parser.add_argument("--sns-records", type=int, default=10)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    args = parser.parse_args()
+    if os.path.exists(args.output) and not args.force:
+        parser.error("%s exists, use --force to overwrite it" % args.output)
+
+    results = {}
+    with ResponseServer(record=False) as server:
+        for name, fn in benchmarks(server.url, args.sns_records):
+            results[name] = measure(fn, args.min_time)
+            print(
+                "%-18s %10.1f ops/sec %10d peak bytes %6d retained blocks"
+                % (name, results[name]["ops_per_sec"], results[name]["peak_bytes"], results[name]["retained_blocks"])
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"version": version(), "revision": revision(), "python": platform.python_version(), "results": results}, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
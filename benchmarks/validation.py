@@ -0,0 +1,111 @@
+"""
+measures the per-request validation cost, with and without the compiled validator cache, and
+the cost of validating a large nested request schema with the interpreted and compiled engine.
+
+    python benchmarks/validation.py
+"""
+import timeit
+from uuid import uuid4
+
+import jsonschema
+
+from cfn_resource_provider import default_injecting_validator, schema_cache, schema_compiler
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+request = {
+    "RequestType": "Create",
+    "ResponseURL": "https://httpbin.org/put",
+    "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+    "RequestId": "request-%s" % uuid4(),
+    "ResourceType": "Custom::Resource",
+    "LogicalResourceId": "MyCustomResource",
+    "ResourceProperties": {"Name": "bla"},
+}
+
+response = {
+    "Status": "SUCCESS",
+    "Reason": "",
+    "StackId": request["StackId"],
+    "RequestId": request["RequestId"],
+    "LogicalResourceId": request["LogicalResourceId"],
+    "PhysicalResourceId": "physical-resource-id",
+    "Data": {},
+}
+
+request_schema = {
+    "type": "object",
+    "required": ["Name"],
+    "properties": {
+        "Name": {"type": "string", "minLength": 1, "pattern": "[a-zA-Z0-9_/]+"},
+        "Description": {"type": "string", "default": ""},
+        "ReturnSecret": {"type": "boolean", "default": False},
+        "Length": {"type": "integer", "minimum": 1, "maximum": 512, "default": 30},
+    },
+}
+
+
+def uncached():
+    jsonschema.validate(request, ResourceProvider.cfn_request_schema)
+    default_injecting_validator.validator(request_schema).validate(dict(request["ResourceProperties"]))
+    jsonschema.validate(response, ResourceProvider.cfn_response_schema)
+
+
+def cached():
+    schema_cache.validate(request, ResourceProvider.cfn_request_schema)
+    default_injecting_validator.validate(dict(request["ResourceProperties"]), request_schema)
+    schema_cache.validate(response, ResourceProvider.cfn_response_schema)
+
+
+nested_schema = {
+    "type": "object",
+    "properties": {
+        "Resource%d" % i: {
+            "type": "object",
+            "required": ["Name"],
+            "properties": {
+                "Name": {"type": "string", "minLength": 1},
+                "Enabled": {"type": "boolean", "default": True},
+                "Port": {"type": "integer", "minimum": 1, "maximum": 65535, "default": 443},
+                "Tags": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["Key"],
+                        "properties": {"Key": {"type": "string"}, "Value": {"type": "string", "default": ""}},
+                    },
+                },
+            },
+        }
+        for i in range(50)
+    },
+}
+
+nested_properties = {
+    "Resource%d" % i: {"Name": "resource-%d" % i, "Tags": [{"Key": "k%d" % j} for j in range(10)]}
+    for i in range(50)
+}
+
+
+def interpreted():
+    default_injecting_validator.validate(nested_properties, nested_schema)
+
+
+def compiled():
+    schema_compiler.validate(nested_properties, nested_schema)
+
+
+def report(name, fn, number=2000):
+    fn()
+    elapsed = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print("%-12s %8.1f us/request" % (name, elapsed * 1e6))
+    return elapsed
+
+
+if __name__ == "__main__":
+    before = report("uncached", uncached)
+    after = report("cached", cached)
+    print("speedup      %8.1fx" % (before / after))
+
+    before = report("interpreted", interpreted, number=100)
+    after = report("compiled", compiled, number=100)
+    print("speedup      %8.1fx" % (before / after))
@@ -1,4 +1,29 @@
-from .resource_provider  import ResourceProvider
-from .sns_envelope  import SnsEnvelope
+"""
+The provider classes are imported on first use, so that importing the package does not slow down the
+cold start of the Lambda.
+"""
+import importlib
 
-__all__ = [ResourceProvider, SnsEnvelope]
\ No newline at end of file
+_exports = {
+    'ResourceProvider': '.resource_provider',
+    'SnsEnvelope': '.sns_envelope',
+    'SqsEnvelope': '.sqs_envelope',
+    'ResourceProviderRouter': '.router',
+    'AsyncResourceProvider': '.async_resource_provider',
+    'AsyncSnsEnvelope': '.async_sns_envelope',
+    'memoize': '.memoization',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module(_exports[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,113 @@
+"""
+asyncio counterpart of the ResourceProvider, for providers which make many independent calls.
+"""
+import asyncio
+import inspect
+import logging
+
+from cfn_resource_provider import delivery, transport
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+log = logging.getLogger()
+
+
+class AsyncResourceProvider(ResourceProvider):
+    """
+    Custom CloudFormation Resource Provider, of which `create`, `update` and `delete` are coroutines.
+
+    The request is validated and failures are reported exactly like in the ResourceProvider. The
+    response is sent without blocking the event loop, so that many requests can be handled
+    concurrently on a single loop.
+    """
+
+    is_async = True
+
+    async def create(self):
+        """
+        create the custom resource
+        """
+        super(AsyncResourceProvider, self).create()
+
+    async def update(self):
+        """
+        update the custom resource
+        """
+        super(AsyncResourceProvider, self).update()
+
+    async def delete(self):
+        """
+        delete the custom resource
+        """
+        super(AsyncResourceProvider, self).delete()
+
+    async def execute(self):
+        """
+        execute the request. The request type hook may be a coroutine or a plain method.
+        """
+        if self.replay_response():
+            return
+        try:
+            self.ensure_setup()
+            if self.is_executable_request():
+                with self.metrics.phase('hook'):
+                    result = self.request_type_hook()()
+                    if inspect.isawaitable(result):
+                        await result
+                with self.metrics.phase('is_valid_cfn_response'):
+                    self.is_valid_cfn_response()
+        except Exception:
+            self.fail_on_exception()
+        finally:
+            self.set_failed_physical_resource_id()
+
+    async def handle(self, request, context):
+        """
+        handles the CloudFormation request.
+        """
+        self.begin_request(request, context)
+        self.arm_watchdog()
+        try:
+            await self.execute()
+        finally:
+            await self.disarm_watchdog_async()
+        return await self.complete_request_async()
+
+    async def disarm_watchdog_async(self):
+        """
+        like `disarm_watchdog`, but waits for a watchdog which already fired in a worker thread, so that
+        its retrying send does not block the event loop.
+        """
+        watchdog = self.watchdog
+        if watchdog is not None:
+            watchdog.cancel()
+            if watchdog.is_alive():
+                await asyncio.to_thread(watchdog.join)
+            self.watchdog = None
+
+    async def complete_request_async(self):
+        """
+        like `complete_request`, but sends the response without blocking the event loop.
+        """
+        try:
+            if self.finish_request():
+                with self.metrics.phase('send_response'):
+                    await self.send_response_async()
+        finally:
+            self.emit_request_metrics(self.final_response)
+        return self.final_response
+
+    async def send_response_async(self, response=None):
+        """
+        sends the response to `ResponseURL`, by default `self.response`. The put is executed by the
+        pooled transport in a worker thread, the delays between retries are awaited.
+        """
+        url = self.response_url
+        body = self.encode_response(response)
+        response_transport = self.response_transport or transport.get_transport()
+
+        async def put(max_timeout):
+            return await asyncio.to_thread(
+                response_transport.put, url, body, {'content-type': ''}, max_timeout=max_timeout
+            )
+
+        self.delivery_result = await delivery.deliver_async(url, put, self.response_retry_policy, self.context)
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Type, Union
+
+from . import provider_pool
+from .async_resource_provider import AsyncResourceProvider
+from .resource_provider import ResourceProvider
+from .response_encoder import failed_response
+from .response_store import ResponseStore
+from .router import ResourceProviderRouter, create_provider
+from .sns_envelope import SnsEnvelope, dedup_key, is_valid_sns_request
+
+log = logging.getLogger()
+
+
+class NoLimit(object):
+    """
+    an async context manager which does not limit anything, as contextlib.nullcontext only supports
+    `async with` from Python 3.10.
+    """
+
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+no_limit = NoLimit()
+
+
+class AsyncSnsEnvelope(object):
+    """
+    unpacks the CloudFormation requests in an SNS event, and handles them concurrently on a single
+    event loop. Requests for an AsyncResourceProvider are awaited on the loop, requests for a
+    synchronous ResourceProvider are handled in a worker thread.
+    """
+
+    def __init__(
+        self,
+        resource_provider: Union[Type[ResourceProvider], ResourceProviderRouter],
+        max_concurrency: Optional[int] = None,
+        max_concurrency_per_type: Optional[int] = None,
+        dedup: Optional[ResponseStore] = None,
+    ) -> None:
+        """
+        `resource_provider` is the provider class handling the requests, or a router which dispatches each
+        request to the provider class for its ResourceType.
+
+        at most `max_concurrency` records are handled at the same time, with at most `max_concurrency_per_type`
+        records of the same ResourceType. None means unlimited.
+
+        when a `dedup` response store is specified, the response to a request which was already handled
+        is replayed from the store, instead of executing the request again.
+        """
+        self.provider = resource_provider
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_type = max_concurrency_per_type
+        self.dedup = dedup
+        self._semaphores: Dict[Optional[str], asyncio.Semaphore] = {}
+
+    async def handle(self, event: dict, context: Any) -> List[dict]:
+        """
+        handles all messages in the SNS payload concurrently, and returns the responses in the order
+        of the records. A failing record does not affect the others.
+        """
+        if not is_valid_sns_request(event):
+            raise Exception("The provided event is not compliant with the SNS schema.")
+
+        self._semaphores = {}
+        limit = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else no_limit
+        return await asyncio.gather(*[self.handle_isolated(record, context, limit) for record in event["Records"]])
+
+    async def handle_isolated(self, record: dict, context: Any, limit: Any = None) -> dict:
+        """
+        handles a single record, returning a FAILED response instead of raising an exception.
+        """
+        request: dict = {}
+        try:
+            request = SnsEnvelope.decode(record)
+            async with limit or no_limit, self._semaphore(request.get("ResourceType")):
+                return await self.handle_request(request, context)
+        except Exception as e:
+            log.error("failed to handle request %s, %s", request.get("RequestId"), e)
+            return failed_response(request, e)
+
+    async def handle_request(self, request: dict, context: Any) -> dict:
+        """
+        handles a single CloudFormation request, or replays the response if it is a duplicate.
+        """
+        key = None
+        if self.dedup is not None:
+            key = dedup_key(request)
+            response = self.dedup.get(key)
+            if response is not None:
+                log.info("replaying response to duplicate request %s", key)
+                return response
+
+        provider = create_provider(self.provider, request)
+        try:
+            if isinstance(provider, AsyncResourceProvider):
+                response = await provider.handle(request, context)
+            else:
+                response = await asyncio.to_thread(provider.handle, request, context)
+
+            if key is not None and not provider.asynchronous:
+                self.dedup.put(key, response)
+            return response
+        finally:
+            provider_pool.release(provider)
+
+    def _semaphore(self, resource_type: Optional[str]) -> Any:
+        """
+        returns the semaphore limiting the concurrency for `resource_type`.
+        """
+        if not self.max_concurrency_per_type:
+            return no_limit
+        semaphore = self._semaphores.get(resource_type)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_type)
+            self._semaphores[resource_type] = semaphore
+        return semaphore
@@ -0,0 +1,175 @@
+"""
+handles a batch of CloudFormation requests, passing the valid requests of the same provider class and
+request type to the `create_many`, `update_many` or `delete_many` hook of the provider at once.
+"""
+import contextlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from . import delivery, provider_pool, transport
+from .resource_provider import ResourceProvider
+from .response_encoder import failed_response
+from .router import ResourceProviderRouter, create_provider, require_synchronous
+
+log = logging.getLogger()
+
+
+class BatchHandler(object):
+    """
+    handles requests in batches. Requests for a provider without a batch hook for the request type are
+    executed one by one. The responses are sent individually, and returned in the order of the requests.
+    """
+
+    def __init__(self, resource_provider: Union[Type[ResourceProvider], ResourceProviderRouter]) -> None:
+        """
+        `resource_provider` is the provider class handling the requests, or a router which dispatches each
+        request to the provider class for its ResourceType. An AsyncResourceProvider is rejected with a
+        TypeError, as its hooks are coroutines.
+        """
+        require_synchronous(resource_provider, "BatchHandler")
+        self.provider = resource_provider
+
+    def handle(self, requests: List[dict], context: Any) -> List[dict]:
+        """
+        handles the `requests`, and returns the responses.
+        """
+        return [response for response, _ in self.handle_requests(requests, context)]
+
+    def handle_requests(self, requests: List[dict], context: Any) -> List[Tuple[dict, bool]]:
+        """
+        handles the `requests`, and returns the response to each request, with a flag which is true if the
+        response was sent, and false if the request is still in progress or its response could not be sent.
+        """
+        providers: List[Optional[ResourceProvider]] = []
+        errors: List[Optional[Exception]] = []
+        groups: Dict[Tuple[type, str], List[ResourceProvider]] = OrderedDict()
+        for request in requests:
+            provider = None
+            try:
+                provider = create_provider(self.provider, request)
+                require_synchronous(type(provider), "BatchHandler")
+                provider.begin_request(request, context)
+            except Exception as e:
+                log.error("failed to handle request %s, %s", request.get("RequestId"), e)
+                if provider is not None:
+                    provider_pool.release(provider)
+                providers.append(None)
+                errors.append(e)
+                continue
+            providers.append(provider)
+            errors.append(None)
+            if provider.replay_response():
+                continue
+            try:
+                provider.ensure_setup()
+                if not provider.is_executable_request():
+                    provider.set_failed_physical_resource_id()
+                    continue
+            except Exception:
+                provider.fail_on_exception()
+                provider.set_failed_physical_resource_id()
+                continue
+            groups.setdefault((provider.__class__, provider.request_type), []).append(provider)
+
+        for (provider_class, request_type), group in groups.items():
+            self.execute(provider_class, request_type, group)
+
+        handled = []
+        for provider, error, request in zip(providers, errors, requests):
+            if provider is None:
+                handled.append(self.send_failed_response(request, "invalid request, %s" % error, context))
+                continue
+            handled.append(self.complete(provider))
+            provider_pool.release(provider)
+        return handled
+
+    def execute(self, provider_class: type, request_type: str, providers: List[ResourceProvider]) -> None:
+        """
+        executes the valid requests of the same `provider_class` and `request_type`. Updates which are
+        skipped are not passed to the batch hook. The duration of the batch hook is recorded as the `hook`
+        phase of each provider in the batch.
+        """
+        execute_many = getattr(provider_class, "%s_many" % request_type.lower(), None)
+        if execute_many is None:
+            for provider in providers:
+                self.execute_one(provider)
+        else:
+            batch = [provider for provider in providers if not self.skip_update(provider)]
+            if batch:
+                log.debug("executing %d %s requests with %s", len(batch), request_type, provider_class.__name__)
+                try:
+                    with contextlib.ExitStack() as phases:
+                        for provider in batch:
+                            phases.enter_context(provider.metrics.phase("hook"))
+                        execute_many(batch)
+                except Exception:
+                    for provider in batch:
+                        provider.fail_on_exception()
+
+        for provider in providers:
+            with provider.metrics.phase("is_valid_cfn_response"):
+                provider.is_valid_cfn_response()
+            provider.set_failed_physical_resource_id()
+
+    @staticmethod
+    def execute_one(provider: ResourceProvider) -> None:
+        try:
+            with provider.metrics.phase("hook"):
+                provider.request_type_hook()()
+        except Exception:
+            provider.fail_on_exception()
+
+    @staticmethod
+    def skip_update(provider: ResourceProvider) -> bool:
+        """
+        skips the update of `provider` if none of the relevant properties changed, and returns true if the
+        request needs no further execution.
+        """
+        try:
+            if not provider.skips_update:
+                return False
+            provider.skip_update()
+        except Exception:
+            provider.fail_on_exception()
+        return True
+
+    @staticmethod
+    def complete(provider: ResourceProvider) -> Tuple[dict, bool]:
+        """
+        sends the response of the provider, and returns it with a flag which is true if it was sent. A failure
+        to send it does not affect the other responses.
+        """
+        try:
+            response = provider.complete_request()
+            return response, not provider.asynchronous
+        except Exception as e:
+            log.error("failed to send the response to request %s, %s", provider.request_id, e)
+            return provider.final_response, False
+
+    @staticmethod
+    def send_failed_response(request: dict, reason: str, context: Any) -> Tuple[dict, bool]:
+        """
+        sends a FAILED response with `reason` to a request which no provider could handle, so that CloudFormation
+        does not wait for it until it times out. Returns the response, with a flag which is true if it was sent.
+        """
+        response = failed_response(request, reason)
+        if request.get("RequestType") == "Create" and not response.get("PhysicalResourceId"):
+            response["PhysicalResourceId"] = "could-not-create"
+        url = request.get("ResponseURL")
+        if not isinstance(url, str):
+            return response, False
+
+        body = json.dumps(response).encode("utf-8")
+        response_transport = transport.get_transport()
+
+        def put(max_timeout: Optional[float]) -> Any:
+            return response_transport.put(url, body, {"content-type": ""}, max_timeout=max_timeout)
+
+        try:
+            delivery.deliver(url, put, ResourceProvider.response_retry_policy, context)
+            return response, True
+        except Exception as e:
+            log.error("failed to send the response to request %s, %s", request.get("RequestId"), e)
+            return response, False
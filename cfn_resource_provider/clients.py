@@ -0,0 +1,119 @@
+"""
+caches the SDK clients used by providers per process, so that a client is built once per service, region,
+credentials and configuration instead of on every request. Clients expire after a time to live, so that
+rotated credentials are picked up.
+"""
+import threading
+import time
+
+from cfn_resource_provider.lazy_import import lazy_import
+
+boto3 = lazy_import("boto3")
+
+
+def boto3_client(service, **kwargs):
+    """
+    returns a new boto3 client for `service`, created from a new session, as sessions are not thread safe.
+    """
+    return boto3.session.Session().client(service, **kwargs)
+
+
+def freeze(value):
+    """
+    returns a hashable representation of `value`.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class ClientRegistry(object):
+    """
+    builds clients with `factory(service, **kwargs)` on first use, and returns the same client for the same
+    service and arguments until it is older than `ttl` seconds. None means clients never expire.
+    The registry can be used from concurrent threads; a client is built once, even when requested concurrently.
+    """
+
+    def __init__(self, factory=boto3_client, ttl=45 * 60, clock=time.monotonic):
+        self.factory = factory
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._clients = {}
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def get(self, service, **kwargs):
+        """
+        returns the client for `service`, created with the keyword arguments, like region_name or
+        aws_session_token.
+        """
+        key = (service, freeze(kwargs))
+        with self._lock:
+            client = self._fresh(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            building = self._building.setdefault(key, threading.Lock())
+
+        with building:
+            with self._lock:
+                client = self._fresh(key)
+                if client is not None:
+                    self.hits += 1
+                    return client
+            client = self.factory(service, **kwargs)
+            with self._lock:
+                self.misses += 1
+                self._clients[key] = (client, self.clock())
+                self._building.pop(key, None)
+                self._evict_expired()
+        return client
+
+    def _fresh(self, key):
+        entry = self._clients.get(key)
+        if entry is None:
+            return None
+        client, created = entry
+        if self.ttl is not None and self.clock() - created >= self.ttl:
+            del self._clients[key]
+            return None
+        return client
+
+    def _evict_expired(self):
+        if self.ttl is None:
+            return
+        now = self.clock()
+        for key in [k for k, (_, created) in self._clients.items() if now - created >= self.ttl]:
+            del self._clients[key]
+
+    def invalidate(self, service=None):
+        """
+        removes the clients of `service`, or all clients, so that they are built again on next use.
+        """
+        with self._lock:
+            for key in [k for k in self._clients if service is None or k[0] == service]:
+                del self._clients[key]
+
+    @property
+    def stats(self):
+        """
+        returns the hit and miss counters.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._clients)
+
+
+registry = ClientRegistry()
+
+
+def get_client(service, **kwargs):
+    """
+    returns the client for `service` from the default registry.
+    """
+    return registry.get(service, **kwargs)
@@ -0,0 +1,78 @@
+"""
+schedules the continuation of long running requests. A provider which calls `in_progress` is not
+answered, instead the request is handed to a scheduler, which re-invokes the provider later with
+the checkpoint state in request['Continuation'].
+"""
+import copy
+import heapq
+import itertools
+import json
+import threading
+import time
+
+
+class Scheduler(object):
+    """
+    interface of the schedulers.
+    """
+
+    def schedule(self, request, delay):
+        """
+        arranges for `request` to be handled again, `delay` seconds from now.
+        """
+        raise NotImplementedError()
+
+
+class InProcessScheduler(Scheduler):
+    """
+    keeps the scheduled requests in memory, until `run` hands them to a handler. A local stand-in for
+    a real scheduler, for tests and local runs.
+    """
+
+    def __init__(self):
+        self._scheduled = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def schedule(self, request, delay):
+        with self._lock:
+            heapq.heappush(self._scheduled, (time.monotonic() + delay, next(self._counter), copy.deepcopy(request)))
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def run(self, handler, context=None, wait=True):
+        """
+        calls `handler(request, context)` for each scheduled request in order of due time, until no
+        requests are scheduled. Waits until a request is due, unless `wait` is false.
+        returns the responses of the handler.
+        """
+        responses = []
+        while True:
+            with self._lock:
+                if not self._scheduled:
+                    return responses
+                due, _, request = heapq.heappop(self._scheduled)
+            if wait:
+                time.sleep(max(0.0, due - time.monotonic()))
+            responses.append(handler(request, context))
+
+
+class SqsScheduler(Scheduler):
+    """
+    sends the request as message to the SQS queue at `queue_url`, using the boto3 SQS `client`. The Lambda
+    subscribed to the queue handles the request again. SQS delays messages at most 900 seconds.
+    """
+
+    max_delay = 900
+
+    def __init__(self, client, queue_url):
+        self.client = client
+        self.queue_url = queue_url
+
+    def schedule(self, request, delay):
+        self.client.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps(request),
+            DelaySeconds=int(min(max(0, delay), self.max_delay)),
+        )
@@ -3,8 +3,12 @@ implements a schema validator which put the defaults in the object which is vali
 Copied straight from
 https://python-jsonschema.readthedocs.io/en/latest/faq/#why-doesn-t-my-schema-that-has-a-default-property-actually-set-the-default-on-my-instance
 """
+import copy
+
 from jsonschema import Draft4Validator, validators
 
+from cfn_resource_provider.schema_cache import SchemaCache
+
 
 def extend_with_default(validator_class):
     validate_properties = validator_class.VALIDATORS["properties"]
@@ -12,7 +16,8 @@ def extend_with_default(validator_class):
     def set_defaults(validator, properties, instance, schema):
         for prop, subschema in properties.items():
             if "default" in subschema:
-                instance.setdefault(prop, subschema["default"])
+                # a copy, as the schema and its default values are shared by all requests
+                instance.setdefault(prop, copy.deepcopy(subschema["default"]))
 
         for error in validate_properties(validator, properties, instance, schema,):
             yield error
@@ -24,9 +29,12 @@ def extend_with_default(validator_class):
 
 validator = extend_with_default(Draft4Validator)
 
+validator_cache = SchemaCache(validator)
+
 
 def validate(obj, schema):
     """
     validates the object against the schema, inserting default values when required
     """
-    validator(schema).validate(obj)
+    validator_cache.get(schema).validate(obj)
+
@@ -0,0 +1,173 @@
+"""
+delivers responses to the ResponseURL, retrying failed attempts with exponential backoff and jitter
+until the Lambda deadline approaches.
+"""
+import logging
+import random
+import time
+
+from cfn_resource_provider.lazy_import import lazy_import
+
+asyncio = lazy_import("asyncio")
+http_client = lazy_import("http.client")
+
+log = logging.getLogger()
+
+
+class DeliveryError(Exception):
+    """
+    raised when the response could not be delivered.
+    """
+
+    def __init__(self, message, result):
+        super(DeliveryError, self).__init__(message)
+        self.result = result
+
+
+class RetryPolicy(object):
+    """
+    specifies how often and how long to retry the delivery of a response.
+
+    The delay before attempt n + 1 is a random value between 0 and min(`max_delay`, `base_delay` * 2^(n - 1))
+    seconds. No attempt is started within `deadline_margin` seconds of the Lambda deadline.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=0.1, max_delay=2.0, deadline_margin=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_margin = deadline_margin
+
+    def delay(self, attempt):
+        """
+        returns the delay in seconds after failed attempt number `attempt`.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    @staticmethod
+    def is_retryable(status_code):
+        """
+        returns true if a response with `status_code` may succeed when retried.
+        """
+        return status_code >= 500 or status_code in (408, 429)
+
+
+class DeliveryResult(object):
+    """
+    the outcome of a delivery: the number of attempts, the elapsed seconds and the last status code.
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.status_code = None
+        self.delivered = False
+
+    def __repr__(self):
+        return "DeliveryResult(delivered=%s, attempts=%d, elapsed=%.3f, status_code=%s)" % (
+            self.delivered,
+            self.attempts,
+            self.elapsed,
+            self.status_code,
+        )
+
+
+def remaining_time(context):
+    """
+    returns the remaining execution time of the Lambda in seconds, or None if unknown.
+    """
+    get_remaining_time_in_millis = getattr(context, "get_remaining_time_in_millis", None)
+    return get_remaining_time_in_millis() / 1000.0 if get_remaining_time_in_millis else None
+
+
+class Delivery(object):
+    """
+    the state of the delivery of a response, which decides after each attempt whether and when to retry.
+    Used by both `deliver` and `deliver_async`, which only differ in how they put and sleep.
+    """
+
+    def __init__(self, url, policy, context=None):
+        self.url = url
+        self.policy = policy
+        self.result = DeliveryResult()
+        self.start = time.monotonic()
+        remaining = remaining_time(context)
+        self.deadline = self.start + remaining - policy.deadline_margin if remaining is not None else None
+
+    def begin_attempt(self):
+        """
+        starts the next attempt, and returns its `max_timeout`.
+        """
+        self.result.attempts += 1
+        return max(0.1, self.deadline - time.monotonic()) if self.deadline is not None else None
+
+    def next_delay(self, response=None, exception=None):
+        """
+        records the outcome of the attempt, the `response` or the `exception` raised by the put. Returns None
+        if the response was delivered, otherwise the delay in seconds before the next attempt.
+
+        raises DeliveryError if the error is not retryable, the attempts are exhausted or no time is left.
+        """
+        result = self.result
+        result.elapsed = time.monotonic() - self.start
+        if exception is not None:
+            error = "failed to put the response to %s, %s" % (self.url, exception)
+            retryable = True
+        elif response.status_code == 200:
+            result.status_code = response.status_code
+            result.delivered = True
+            if result.attempts > 1:
+                log.info("delivered response to %s, %s", self.url, result)
+            return None
+        else:
+            result.status_code = response.status_code
+            error = "failed to put the response to %s status code %d, %s" % (
+                self.url,
+                response.status_code,
+                response.text,
+            )
+            retryable = self.policy.is_retryable(response.status_code)
+
+        delay = self.policy.delay(result.attempts)
+        if not retryable or result.attempts >= self.policy.max_attempts:
+            raise DeliveryError(error, result)
+        if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+            raise DeliveryError("%s, no time left to retry" % error, result)
+
+        log.warning("%s, retrying in %.2fs", error, delay)
+        return delay
+
+
+def deliver(url, put, policy, context=None):
+    """
+    calls `put(max_timeout)` until it returns a response with status code 200, the attempts are exhausted,
+    the error is not retryable or the deadline of the Lambda `context` approaches. `max_timeout` is
+    the number of seconds left before the deadline, or None if there is no deadline.
+
+    returns the DeliveryResult, raises DeliveryError if the response was not delivered.
+    """
+    delivery = Delivery(url, policy, context)
+    while True:
+        try:
+            delay = delivery.next_delay(put(delivery.begin_attempt()))
+        except (OSError, http_client.HTTPException) as e:
+            delay = delivery.next_delay(exception=e)
+        if delay is None:
+            return delivery.result
+        time.sleep(delay)
+
+
+async def deliver_async(url, put, policy, context=None):
+    """
+    like `deliver`, but awaits the coroutine `put(max_timeout)` and sleeps between the attempts without
+    blocking the event loop.
+    """
+    delivery = Delivery(url, policy, context)
+    while True:
+        try:
+            delay = delivery.next_delay(await put(delivery.begin_attempt()))
+        except (OSError, http_client.HTTPException) as e:
+            delay = delivery.next_delay(exception=e)
+        if delay is None:
+            return delivery.result
+        await asyncio.sleep(delay)
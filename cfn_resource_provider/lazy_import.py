@@ -0,0 +1,30 @@
+"""
+defers the import of heavy dependencies until they are first used, to reduce the cold start time of the Lambda.
+"""
+import importlib
+
+
+class LazyModule(object):
+    """
+    a stand-in for the module `name`, which is imported on first attribute access.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return "<lazy module %r%s>" % (self._name, "" if self._module is None else " (imported)")
+
+
+def lazy_import(name):
+    """
+    returns a LazyModule for `name`.
+    """
+    return LazyModule(name)
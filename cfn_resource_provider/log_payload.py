@@ -0,0 +1,39 @@
+"""
+defers the JSON serialisation of logged requests and responses until the log record is emitted,
+so that debug logging costs nothing when it is disabled.
+"""
+import json
+
+REDACTED = "*****"
+
+
+def redact_no_echo(response):
+    """
+    returns the response with the values of the Data masked, if NoEcho is set.
+    """
+    if not response.get("NoEcho") or not isinstance(response.get("Data"), dict):
+        return response
+    return dict(response, Data={name: REDACTED for name in response["Data"]})
+
+
+class LazyJson(object):
+    """
+    formats `value` as JSON when converted to a string, after applying `redact`. The string is capped
+    to `max_length` characters, None means unlimited.
+    """
+
+    __slots__ = ("value", "redact", "max_length")
+
+    def __init__(self, value, redact=None, max_length=4096):
+        self.value = value
+        self.redact = redact
+        self.max_length = max_length
+
+    def __str__(self):
+        value = self.redact(self.value) if self.redact else self.value
+        s = json.dumps(value, default=repr)
+        if self.max_length is not None and len(s) > self.max_length:
+            return "%s... (%d characters truncated)" % (s[: self.max_length], len(s) - self.max_length)
+        return s
+
+    __repr__ = __str__
@@ -0,0 +1,178 @@
+"""
+memoizes read-only lookups of providers, like resolving an AMI or a hosted zone, across requests and
+warm invocations, with a time to live and a least recently used bound.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+_kwargs_mark = object()
+
+
+def make_key(args, kwargs):
+    """
+    returns the cache key of the arguments, which must be hashable.
+    """
+    key = args
+    if kwargs:
+        key += (_kwargs_mark,) + tuple(sorted(kwargs.items()))
+    return key
+
+
+class Flight(object):
+    """
+    a call in progress, of which the result is shared with concurrent identical calls.
+    """
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Memoized(object):
+    """
+    caches the results of `function` per arguments, for `ttl` seconds and at most `max_size` results.
+    Used on a method, `self` is not part of the key, so all instances share the cache. Concurrent calls
+    with the same arguments wait for the first to complete, instead of calling `function` as well.
+    Exceptions are not cached.
+    """
+
+    def __init__(self, function, ttl=None, max_size=128, clock=time.monotonic):
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._flights = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return BoundMemoized(self, instance)
+
+    def __call__(self, *args, **kwargs):
+        return self.call(None, args, kwargs)
+
+    def call(self, instance, args, kwargs):
+        """
+        returns the cached result for the arguments, or calls the function.
+        """
+        key = make_key(args, kwargs)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or self.clock() < expires:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._cache[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight(self._generation)
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            if instance is None:
+                flight.value = self.function(*args, **kwargs)
+            else:
+                flight.value = self.function(instance, *args, **kwargs)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.error is None and flight.generation == self._generation:
+                    self._store(key, flight.value)
+            flight.done.set()
+
+    def _store(self, key, value):
+        self._cache[key] = (value, self.clock() + self.ttl if self.ttl is not None else None)
+        self._cache.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, *args, **kwargs):
+        """
+        removes the cached result for the arguments.
+        """
+        with self._lock:
+            self._cache.pop(make_key(args, kwargs), None)
+            self._generation += 1
+
+    def cache_clear(self):
+        """
+        removes all cached results.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+    @property
+    def stats(self):
+        """
+        returns the hit and miss counters, and the number of cached results.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+
+class BoundMemoized(object):
+    """
+    a memoized method bound to an instance.
+    """
+
+    __slots__ = ("memoized", "instance")
+
+    def __init__(self, memoized, instance):
+        self.memoized = memoized
+        self.instance = instance
+
+    def __call__(self, *args, **kwargs):
+        return self.memoized.call(self.instance, args, kwargs)
+
+    def invalidate(self, *args, **kwargs):
+        self.memoized.invalidate(*args, **kwargs)
+
+    def cache_clear(self):
+        self.memoized.cache_clear()
+
+    @property
+    def stats(self):
+        return self.memoized.stats
+
+
+def memoize(ttl=None, max_size=128, clock=time.monotonic):
+    """
+    decorator memoizing a function or method for `ttl` seconds, keeping at most `max_size` results::
+
+        class AmiProvider(ResourceProvider):
+            @memoize(ttl=300)
+            def lookup_ami(self, name):
+                ...
+    """
+
+    def decorator(function):
+        return Memoized(function, ttl, max_size, clock)
+
+    return decorator
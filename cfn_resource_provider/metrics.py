@@ -0,0 +1,102 @@
+"""
+records the duration of the phases of handling a request, and writes them to stdout in the CloudWatch
+Embedded Metric Format, from which CloudWatch Logs extracts the metrics.
+"""
+import contextlib
+import json
+import sys
+import time
+
+_null_phase = contextlib.nullcontext()
+
+
+class Phase(object):
+    """
+    context manager recording the duration of the phase `name` in the timer.
+    """
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        durations = self.timer.durations
+        durations[self.name] = durations.get(self.name, 0.0) + (time.perf_counter() - self.start) * 1000.0
+        return False
+
+
+class PhaseTimer(object):
+    """
+    records the duration in milliseconds of each phase, and of the request as a whole.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.durations = {}
+        self.start = time.perf_counter()
+
+    def phase(self, name):
+        """
+        returns a context manager recording the duration of the phase `name`.
+        """
+        return Phase(self, name)
+
+    def emit(self, namespace, dimensions, counts=None, properties=None, stream=None):
+        """
+        writes the durations and `counts` as an Embedded Metric Format record, with the `dimensions`
+        and `properties`.
+        """
+        stream = stream or sys.stdout
+        stream.write(json.dumps(self.record(namespace, dimensions, counts, properties)) + "\n")
+        stream.flush()
+
+    def record(self, namespace, dimensions, counts=None, properties=None):
+        """
+        returns the Embedded Metric Format record of the durations and `counts`.
+        """
+        values = dict(self.durations)
+        values["Duration"] = (time.perf_counter() - self.start) * 1000.0
+        counts = counts or {}
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": namespace,
+                        "Dimensions": [list(dimensions)],
+                        "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in values]
+                        + [{"Name": name, "Unit": "Count"} for name in counts],
+                    }
+                ],
+            }
+        }
+        record.update(properties or {})
+        record.update(dimensions)
+        record.update(values)
+        record.update(counts)
+        return record
+
+
+class DisabledTimer(object):
+    """
+    a timer which records nothing.
+    """
+
+    enabled = False
+    durations = {}
+
+    def phase(self, name):
+        return _null_phase
+
+    def emit(self, namespace, dimensions, counts=None, properties=None, stream=None):
+        pass
+
+
+disabled = DisabledTimer()
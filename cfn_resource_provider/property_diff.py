@@ -0,0 +1,41 @@
+"""
+structural comparison of resource properties.
+"""
+
+
+def diff(old, new, path=()):
+    """
+    returns the paths at which `old` and `new` differ, as tuples of property names and list indexes.
+    Objects are compared per property and lists per item; a value of a different type differs as a whole.
+    """
+    changes = []
+    _diff(old, new, path, changes)
+    return changes
+
+
+def _diff(old, new, path, changes):
+    if old is new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for name in old:
+            if name not in new:
+                changes.append(path + (name,))
+            else:
+                _diff(old[name], new[name], path + (name,), changes)
+        for name in new:
+            if name not in old:
+                changes.append(path + (name,))
+    elif isinstance(old, list) and isinstance(new, list):
+        for i in range(min(len(old), len(new))):
+            _diff(old[i], new[i], path + (i,), changes)
+        for i in range(min(len(old), len(new)), max(len(old), len(new))):
+            changes.append(path + (i,))
+    elif type(old) is not type(new) or old != new:
+        changes.append(path)
+
+
+def format_path(path):
+    """
+    returns the `path` as a string, eg. "Tags/0/Value".
+    """
+    return "/".join(str(p) for p in path)
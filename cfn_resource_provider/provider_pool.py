@@ -0,0 +1,75 @@
+"""
+keeps idle provider instances per provider class, so that instances, and whatever they built in their
+constructor, are reused across records and warm invocations instead of being constructed per request.
+"""
+import threading
+from collections import deque
+
+
+class ProviderPool(object):
+    """
+    a pool of at most `max_idle` idle instances of `provider_class`. Instances are handed out to one
+    user at a time, so the pool can be used from concurrent threads.
+    """
+
+    def __init__(self, provider_class, max_idle=16):
+        self.provider_class = provider_class
+        self.max_idle = max_idle
+        self.created = 0
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        returns an idle instance, or a new one if none is idle.
+        """
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return self.provider_class()
+
+    def release(self, provider):
+        """
+        returns the `provider` to the pool, after it handled its request.
+        """
+        if type(provider) is not self.provider_class or not provider.reusable:
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(provider)
+
+    def __len__(self):
+        return len(self._idle)
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_pool(provider_class):
+    """
+    returns the process wide pool of `provider_class` instances.
+    """
+    pool = _pools.get(provider_class)
+    if pool is None:
+        with _lock:
+            pool = _pools.setdefault(provider_class, ProviderPool(provider_class))
+    return pool
+
+
+def acquire(provider_class):
+    """
+    returns an instance of `provider_class` from its pool, or a new instance if the class is not reusable.
+    """
+    if not provider_class.reusable:
+        return provider_class()
+    return get_pool(provider_class).acquire()
+
+
+def release(provider):
+    """
+    returns `provider` to the pool of its class.
+    """
+    if provider.reusable:
+        get_pool(type(provider)).release(provider)
@@ -1,23 +1,30 @@
-import json
+import copy
+import functools
 import logging
 import sys
+import threading
 import traceback
 
-import jsonschema
-import requests
+from cfn_resource_provider import (clients, delivery, log_payload, metrics, property_diff, response_encoder,
+                                   schema_cache, transport, type_coercion)
+from cfn_resource_provider.lazy_import import lazy_import
+from cfn_resource_provider.type_coercion import is_int
 
-from cfn_resource_provider import default_injecting_validator
+jsonschema = lazy_import('jsonschema')
+default_injecting_validator = lazy_import('cfn_resource_provider.default_injecting_validator')
+schema_compiler = lazy_import('cfn_resource_provider.schema_compiler')
 
 log = logging.getLogger()
 
+_setup_lock = threading.RLock()
 
-def is_int(s):
+
+@functools.lru_cache(maxsize=None)
+def custom_cfn_resource_name(provider_class):
     """
-    returns true, if the string is a proper decimal integer value
+    returns the custom resource type name handled by `provider_class`, Custom::<class name without Provider>.
     """
-    if len(s) > 0 and s[0] in ('-', '+'):
-        return s[1:].isdigit()
-    return s.isdigit()
+    return 'Custom::%s' % provider_class.__name__.replace('Provider', '')
 
 
 class ResourceProvider(object):
@@ -25,6 +32,107 @@ class ResourceProvider(object):
     Custom CloudFormation Resource Provider.
     """
 
+    """
+    compile the request_schema into Python code, instead of interpreting it on every request.
+    """
+    compile_request_schema = False
+
+    """
+    how to retry the delivery of the response to the ResponseURL.
+    """
+    response_retry_policy = delivery.RetryPolicy()
+
+    """
+    the transport.Transport used to send the response, by default the transport.get_transport().
+    """
+    response_transport = None
+
+    """
+    number of seconds before the Lambda deadline at which a FAILED response is sent, if the request is
+    still being executed. None disables the watchdog.
+    """
+    timeout_margin = 2.0
+
+    """
+    the continuation.Scheduler which re-invokes the provider for requests which are `in_progress`.
+    """
+    scheduler = None
+
+    """
+    default number of seconds before an `in_progress` request is handled again.
+    """
+    poll_interval = 30
+
+    """
+    maximum number of times a request is continued, before it fails. None means unlimited.
+    """
+    max_continuation_attempts = 120
+
+    """
+    the response_store.ResponseStore recording the response to each request. A repeated request is answered
+    with the recorded response, instead of being executed again. None disables idempotency.
+    """
+    idempotency_store = None
+
+    """
+    names of the properties of which a change requires the replacement of the resource.
+    """
+    replacement_properties = []
+
+    """
+    names of the properties of which a change is applied by `update`. None means all properties.
+    """
+    update_properties = None
+
+    """
+    skip `update` when no replacement or update property changed. The response of a skipped update has
+    no Data, so only enable this if the resource has no attributes, or override `skip_update`.
+    """
+    skip_unchanged_update = False
+
+    """
+    write the duration of each phase of handling a request to stdout, as CloudWatch Embedded Metric Format.
+    """
+    emit_metrics = False
+
+    """
+    the CloudWatch namespace of the metrics.
+    """
+    metrics_namespace = 'CustomResourceProviders'
+
+    """
+    maximum number of characters of a request or response logged at debug level. None means unlimited.
+    """
+    log_payload_max_length = 4096
+
+    """
+    maximum size in bytes of the response, CloudFormation rejects larger responses.
+    """
+    max_response_size = response_encoder.MAX_RESPONSE_SIZE
+
+    """
+    what to do with a response exceeding `max_response_size`: "fail" sends a FAILED response stating
+    the size, "trim" removes the largest attributes from the Data.
+    """
+    response_size_policy = 'fail'
+
+    """
+    whether instances may be reused for subsequent requests, by the provider_pool. Only enable this if
+    `reset` clears all state the provider keeps of its own, as it otherwise leaks into the next request.
+    """
+    reusable = False
+
+    """
+    true for providers of which `handle` is a coroutine, like the AsyncResourceProvider. Their requests can not
+    be handled by the synchronous SnsEnvelope, SqsEnvelope, ResourceProviderRouter.handle and BatchHandler.
+    """
+    is_async = False
+
+    """
+    the clients.ClientRegistry from which `get_client` returns clients, by default the clients.registry.
+    """
+    client_registry = None
+
     def __init__(self):
         """
         constructor
@@ -33,6 +141,8 @@ class ResourceProvider(object):
         self.response = None
         self.context = None
         self.asynchronous = False
+        self.delivery_result = None
+        self.metrics = metrics.disabled
         """
         default json schema for request['ResourceProperties']. Override in your subclass.
         """
@@ -40,18 +150,62 @@ class ResourceProvider(object):
 
     @property
     def custom_cfn_resource_name(self):
-        return 'Custom::%s' % self.__class__.__name__.replace('Provider', '')
+        return custom_cfn_resource_name(self.__class__)
 
     def is_supported_resource_type(self):
         return self.resource_type == self.custom_cfn_resource_name
 
+    @classmethod
+    def setup(cls):
+        """
+        sets up the resources shared by all instances of the class, like clients and caches. Called once per
+        process, before the first request is executed.
+        """
+        pass
+
+    @classmethod
+    def ensure_setup(cls):
+        """
+        calls `setup` of the class, unless it was already called.
+        """
+        if cls.__dict__.get('_setup_complete'):
+            return
+        with _setup_lock:
+            if not cls.__dict__.get('_setup_complete'):
+                cls.setup()
+                cls._setup_complete = True
+
+    def get_client(self, service, **kwargs):
+        """
+        returns the SDK client for `service` with the keyword arguments, like region_name, from the `client_registry`.
+        The client is built on first use and shared across requests and instances.
+        """
+        registry = self.client_registry if self.client_registry is not None else clients.registry
+        return registry.get(service, **kwargs)
+
+    def reset(self):
+        """
+        clears the state of the previous request, when an instance is reused. Override if your provider keeps
+        state of its own between `set_request` and the response.
+        """
+        pass
+
     def set_request(self, request, context):
         """
         sets the lambda request to process.
         """
+        self.reset()
         self.request = request
         self.context = context
         self.asynchronous = False
+        self.delivery_result = None
+        self.watchdog = None
+        self.timed_out_response = None
+        self.continuation = None
+        self.replayed = False
+        self._changed_properties = None
+        self._response_claimed = False
+        self._response_lock = threading.Lock()
         self.response = {
             'Status': 'SUCCESS',
             'Reason': '',
@@ -181,13 +335,140 @@ class ResourceProvider(object):
         self.response['NoEcho'] = value
 
 
+    @property
+    def continuation_state(self):
+        """
+        returns the checkpoint state passed to `in_progress` by the previous invocation, or None.
+        """
+        return self.request.get('Continuation', {}).get('State')
+
+    @property
+    def continuation_attempt(self):
+        """
+        returns the number of times the request has been continued, 0 on the first invocation.
+        """
+        return self.request.get('Continuation', {}).get('Attempt', 0)
+
+    def in_progress(self, state=None, delay=None):
+        """
+        reports the request as in progress: no response is sent, instead the request is handled again
+        after `delay` seconds, by default `poll_interval`, with `state` as `continuation_state`.
+        """
+        if self.scheduler is None:
+            raise ValueError('%s has no scheduler to continue the request' % self.__class__.__name__)
+        self.asynchronous = True
+        self.continuation = {
+            'State': state,
+            'Attempt': self.continuation_attempt + 1,
+            'Delay': self.poll_interval if delay is None else delay
+        }
+
+    def continuation_request(self):
+        """
+        returns the request to handle again, carrying the continuation and the physical resource id.
+        """
+        request = dict(self.request)
+        request['Continuation'] = {'State': self.continuation['State'], 'Attempt': self.continuation['Attempt']}
+        if self.physical_resource_id:
+            request['PhysicalResourceId'] = self.physical_resource_id
+        return request
+
+    def schedule_continuation(self):
+        """
+        hands the request to the scheduler, if the provider called `in_progress` and did not fail.
+        Otherwise, the response is sent as usual.
+        """
+        if self.continuation is None:
+            return
+
+        self.asynchronous = False
+        if self.status != 'SUCCESS':
+            return
+        if self.max_continuation_attempts is not None and self.continuation['Attempt'] > self.max_continuation_attempts:
+            self.fail('%s of %s did not complete after %d attempts' %
+                      (self.request_type, self.logical_resource_id, self.max_continuation_attempts))
+            self.set_failed_physical_resource_id()
+            return
+        try:
+            self.scheduler.schedule(self.continuation_request(), self.continuation['Delay'])
+            self.asynchronous = True
+        except Exception as e:
+            log.error('failed to schedule the continuation of %s, %s', self.logical_resource_id, e)
+            self.fail('failed to schedule the continuation, %s' % e)
+            self.set_failed_physical_resource_id()
+
+    def normalized_old_properties(self):
+        """
+        returns a copy of the old properties, with the property types converted and default values inserted
+        like the properties, so that both can be compared.
+        """
+        request = self.request
+        try:
+            self.request = dict(request, ResourceProperties=copy.deepcopy(self.old_properties))
+            self.convert_property_types()
+            try:
+                self.validate_properties()
+            except jsonschema.ValidationError:
+                pass
+            return self.properties
+        finally:
+            self.request = request
+
+    @property
+    def changed_properties(self):
+        """
+        returns the paths of the properties which differ from the old properties, as tuples of property
+        names and list indexes. On a Create request, all properties are changed.
+        """
+        if self._changed_properties is None:
+            old = self.normalized_old_properties() if 'OldResourceProperties' in self.request else {}
+            self._changed_properties = property_diff.diff(old, self.properties)
+        return self._changed_properties
+
+    def property_changed(self, name):
+        """
+        returns true if the property `name` differs from the old property.
+        """
+        return any(path[0] == name for path in self.changed_properties if path)
+
+    @property
+    def requires_replacement(self):
+        """
+        returns true if any of the `replacement_properties` changed.
+        """
+        return any(self.property_changed(name) for name in self.replacement_properties)
+
+    @property
+    def requires_update(self):
+        """
+        returns true if any of the `replacement_properties` or `update_properties` changed.
+        """
+        if self.update_properties is None:
+            return len(self.changed_properties) > 0
+        return self.requires_replacement or any(self.property_changed(name) for name in self.update_properties)
+
+    @property
+    def skips_update(self):
+        """
+        returns true if the request is an Update which is skipped, as `skip_unchanged_update` is set and
+        none of the relevant properties changed.
+        """
+        return self.request_type == 'Update' and self.skip_unchanged_update and not self.requires_update
+
+    def skip_update(self):
+        """
+        completes an update without relevant property changes.
+        """
+        log.info('no relevant property changes, skipping the update of %s', self.logical_resource_id)
+        self.success()
+
     def is_valid_cfn_request(self):
         """
         returns true when self.request is a valid CloudFormation custom resource request, otherwise false.
         if false, sets self.status and self.reason.
         """
         try:
-            jsonschema.validate(self.request, self.cfn_request_schema)
+            schema_cache.validate(self.request, self.cfn_request_schema)
             return True
         except jsonschema.ValidationError as e:
             self.fail('invalid CloudFormation Request received: %s' % str(e.context))
@@ -199,8 +480,7 @@ class ResourceProvider(object):
         if false, it logs the reason.
         """
         try:
-            jsonschema.validate(
-                self.response, ResourceProvider.cfn_response_schema)
+            schema_cache.validate(self.response, ResourceProvider.cfn_response_schema)
             return True
         except jsonschema.ValidationError as e:
             log.warning('invalid CloudFormation response created: %s', str(e))
@@ -237,6 +517,13 @@ class ResourceProvider(object):
                 pass
         return properties
 
+    def schema_convert_property_types(self, properties):
+        """
+        converts the string values in `properties` to the boolean, integer and number types declared
+        in self.request_schema. Only the properties declared with such a type are visited.
+        """
+        return type_coercion.convert_property_types(properties, self.request_schema)
+
     def is_valid_request(self):
         """
         returns true if `self.properties` is a valid request as specified by the JSON schema self.request_schema, otherwise False.
@@ -244,14 +531,25 @@ class ResourceProvider(object):
         If false, self.reason and self.status are set.
         """
         try:
-            self.convert_property_types()
-            default_injecting_validator.validate(self.properties, self.request_schema)
+            with self.metrics.phase('convert_property_types'):
+                self.convert_property_types()
+            with self.metrics.phase('is_valid_request'):
+                self.validate_properties()
             return True
         except jsonschema.ValidationError as e:
             message = e.message.replace(str(e.instance), "<instance>") if isinstance(e.instance, dict) else e.message
             self.fail('invalid resource properties: %s' % message)
             return False
 
+    def validate_properties(self):
+        """
+        validates `self.properties` against self.request_schema, inserting default values.
+        """
+        if self.compile_request_schema:
+            schema_compiler.validate(self.properties, self.request_schema)
+        else:
+            default_injecting_validator.validate(self.properties, self.request_schema)
+
     def is_supported_request(self):
         """
         returns true if request is `is_supported_resource_type`.
@@ -308,66 +606,283 @@ class ResourceProvider(object):
         """
         self.success('delete not implemented by %s' % self)
 
+    """
+    optional classmethods `create_many(cls, providers)`, `update_many(cls, providers)` and
+    `delete_many(cls, providers)`, which execute the requests of a list of providers in one go, as used by
+    the batch.BatchHandler. Each provider holds a valid request; the hook reports the outcome per provider,
+    using `physical_resource_id`, `set_attribute` and `fail`. An exception fails all providers which did
+    not fail yet.
+    """
+    create_many = None
+    update_many = None
+    delete_many = None
+
+    def is_executable_request(self):
+        """
+        returns true if the request is supported and valid, so that it can be executed. An unsupported
+        or invalid Delete request is reported as a success, as failing it would hang the stack.
+        """
+        with self.metrics.phase('is_supported_request'):
+            supported = self.is_supported_request()
+        if supported:
+            with self.metrics.phase('is_valid_cfn_request'):
+                supported = self.is_valid_cfn_request()
+        if supported and self.is_valid_request():
+            return True
+        if 'RequestType' in self.request and self.request_type == 'Delete':
+            # failure to delete an invalid request hangs your cfn...
+            self.success()
+        return False
+
+    def request_type_hook(self):
+        """
+        returns the method implementing the request type: create, update or delete.
+        """
+        if self.request_type == 'Create':
+            return self.create
+        elif self.request_type == 'Update':
+            if self.skips_update:
+                return self.skip_update
+            return self.update
+        else:
+            assert self.request_type == 'Delete'
+            return self.delete
+
+    def fail_on_exception(self):
+        """
+        fails the request because of the exception being handled, unless it already failed.
+        """
+        etype, value, tb = sys.exc_info()
+        s = ''.join(traceback.format_exception_only(etype, value)).rstrip()
+        if self.status == 'SUCCESS':
+            self.fail(s)
+        log.error('%s', traceback.format_exception(etype, value, tb))
+
+    def set_failed_physical_resource_id(self):
+        """
+        sets a physical resource id on a failed Create request which did not set one.
+        """
+        if not self.physical_resource_id and self.status == 'FAILED':
+            # CFN will complain if the physical_resource_id is not set on
+            # failure to create the physical resource. :-(
+            if self.request_type == 'Create':
+                self.physical_resource_id = 'could-not-create'
+
+    @property
+    def idempotency_key(self):
+        """
+        returns the key of the request in the `idempotency_store`.
+        """
+        return '%s/%s/%s' % (self.stack_id, self.request_id, self.logical_resource_id)
+
+    def replay_response(self):
+        """
+        returns true if the request was handled before, after replacing self.response with the recorded response.
+        """
+        if self.idempotency_store is None:
+            return False
+        try:
+            response = self.idempotency_store.get(self.idempotency_key)
+        except Exception as e:
+            log.warning('failed to read the idempotency store, executing the request, %s', e)
+            return False
+        if response is None:
+            return False
+        log.info('replaying the recorded response to request %s', self.idempotency_key)
+        self.response = response
+        self.replayed = True
+        return True
+
+    def record_response(self):
+        """
+        records the response to the request in the `idempotency_store`.
+        """
+        if self.idempotency_store is None or self.replayed:
+            return
+        try:
+            self.idempotency_store.put(self.idempotency_key, self.response)
+        except Exception as e:
+            log.warning('failed to record the response to request %s, %s', self.idempotency_key, e)
+
     def execute(self):
         """
         execute the request.
         """
+        if self.replay_response():
+            return
         try:
-            if self.is_supported_request() and self.is_valid_cfn_request() and self.is_valid_request():
-                if self.request_type == 'Create':
-                    self.create()
-                elif self.request_type == 'Update':
-                    self.update()
-                else:
-                    assert self.request_type == 'Delete'
-                    self.delete()
-
-                self.is_valid_cfn_response()
-            elif 'RequestType' in self.request and self.request_type == 'Delete':
-                # failure to delete an invalid request hangs your cfn...
-                self.success()
+            self.ensure_setup()
+            if self.is_executable_request():
+                with self.metrics.phase('hook'):
+                    self.request_type_hook()()
+                with self.metrics.phase('is_valid_cfn_response'):
+                    self.is_valid_cfn_response()
         except Exception:
-            etype, value, tb = sys.exc_info()
-            s = ''.join(traceback.format_exception_only(etype, value)).rstrip()
-            if self.status == 'SUCCESS':
-                self.fail(s)
-            log.error('%s', traceback.format_exception(etype, value, tb))
+            self.fail_on_exception()
         finally:
-            if not self.physical_resource_id and self.status == 'FAILED':
-            # CFN will complain if the physical_resource_id is not set on
-            # failure to create the physical resource. :-(
-                if self.request_type == 'Create':
-                    self.physical_resource_id = 'could-not-create'
+            self.set_failed_physical_resource_id()
+
+    def begin_request(self, request, context):
+        """
+        starts handling the CloudFormation request: starts timing its phases, and sets the request.
+        """
+        log.debug('received request %s', log_payload.LazyJson(request, max_length=self.log_payload_max_length))
+        self.metrics = metrics.PhaseTimer() if self.emit_metrics else metrics.disabled
+        with self.metrics.phase('set_request'):
+            self.set_request(request, context)
 
     def handle(self, request, context):
         """
         handles the CloudFormation request.
         """
-        log.debug('received request %s', json.dumps(request))
-        self.set_request(request, context)
-        self.execute()
-        if not self.asynchronous:
-            self.send_response()
+        self.begin_request(request, context)
+        self.arm_watchdog()
+        try:
+            self.execute()
+        finally:
+            self.disarm_watchdog()
+        return self.complete_request()
+
+    def finish_request(self):
+        """
+        completes the executed request up to sending the response: schedules its continuation, or records
+        the response. Returns true if the caller must send the response, false if the request is in progress
+        or the watchdog already sent the timed out response.
+        """
+        if self.timed_out_response is not None:
+            return False
+        self.schedule_continuation()
+        if self.asynchronous:
+            return False
+        self.record_response()
+        return self.claim_response()
 
-        return self.response
+    @property
+    def final_response(self):
+        """
+        returns the response to the request: the timed out response if the watchdog sent it, otherwise `response`.
+        """
+        return self.timed_out_response if self.timed_out_response is not None else self.response
+
+    def complete_request(self):
+        """
+        completes the executed request: schedules its continuation, or records and sends the response.
+        """
+        try:
+            if self.finish_request():
+                with self.metrics.phase('send_response'):
+                    self.send_response()
+        finally:
+            self.emit_request_metrics(self.final_response)
+        return self.final_response
+
+    def emit_request_metrics(self, response):
+        """
+        writes the phase durations and the outcome of the request to stdout, if `emit_metrics` is enabled.
+        """
+        if not self.metrics.enabled:
+            return
+        self.metrics.emit(
+            self.metrics_namespace,
+            {'ResourceType': self.request.get('ResourceType', ''), 'RequestType': self.request.get('RequestType', '')},
+            counts={'Failed': 1 if response['Status'] == 'FAILED' else 0},
+            properties={
+                'RequestId': self.request.get('RequestId'),
+                'LogicalResourceId': self.request.get('LogicalResourceId'),
+                'Status': response['Status'],
+                'InProgress': self.asynchronous,
+                'Replayed': self.replayed
+            })
+
+    def claim_response(self, timed_out_response=None):
+        """
+        returns true if the caller may send the response to the current request. Only the first
+        caller succeeds, so that a late response can not race the response of the watchdog. The
+        watchdog passes its `timed_out_response`, which is set together with the claim.
+        """
+        with self._response_lock:
+            claimed = not self._response_claimed
+            self._response_claimed = True
+            if claimed and timed_out_response is not None:
+                self.timed_out_response = timed_out_response
+            return claimed
+
+    def arm_watchdog(self):
+        """
+        starts a timer which sends a FAILED response `timeout_margin` seconds before the Lambda deadline.
+        """
+        remaining = delivery.remaining_time(self.context)
+        if self.timeout_margin is None or remaining is None:
+            return
+        if remaining <= self.timeout_margin:
+            log.warning('not arming the watchdog, only %.3fs left before the deadline', remaining)
+            return
+        self.watchdog = threading.Timer(remaining - self.timeout_margin, self.send_timed_out_response)
+        self.watchdog.daemon = True
+        self.watchdog.start()
+
+    def disarm_watchdog(self):
+        """
+        stops the watchdog timer, if armed. If the watchdog already fired, waits until it sent the
+        timed out response, so that `timed_out_response` is final.
+        """
+        if self.watchdog is not None:
+            self.watchdog.cancel()
+            self.watchdog.join()
+            self.watchdog = None
+
+    def send_timed_out_response(self):
+        """
+        sends a FAILED response for the request which is still being executed.
+        """
+        response = dict(self.response)
+        response['Status'] = 'FAILED'
+        response['Reason'] = '%s of %s timed out' % (self.request_type, self.logical_resource_id)
+        response['Data'] = {}
+        if not response.get('PhysicalResourceId') and self.request_type == 'Create':
+            response['PhysicalResourceId'] = 'could-not-create'
+        if not self.claim_response(response):
+            return
+
+        log.error('%s, sending FAILED response', response['Reason'])
+        try:
+            self.send_response(response)
+        except Exception as e:
+            log.error('failed to send the timed out response, %s', e)
 
     def _truncate_reason(self):
         if len(self.reason) > 200:
             log.error('truncating Reason to 200 characters to avoid exceeding the, %s', self.reason)
             self.reason = '%.200s...' % self.reason
 
-    def send_response(self):
+    def encode_response(self, response=None):
         """
-        sends the response to `ResponseURL`
+        returns the JSON encoded body of the response to `ResponseURL`, by default of `self.response`. A response
+        exceeding `max_response_size` is handled according to the `response_size_policy`.
         """
-        self._truncate_reason()
-        url = self.request['ResponseURL']
-        log.debug('sending response to %s ->  %s',
-                  url, json.dumps(self.response))
-        r = requests.put(url, json=self.response, headers={'content-type': ''})
-        if r.status_code != 200:
-            raise Exception('failed to put the response to %s status code %d, %s' %
-                            (url, r.status_code, r.text))
+        if response is None:
+            self._truncate_reason()
+            self.response, body = response_encoder.encode(
+                self.response, self.max_response_size, self.response_size_policy)
+            response = self.response
+        else:
+            response, body = response_encoder.encode(response, self.max_response_size, self.response_size_policy)
+        log.debug('sending response to %s ->  %s', self.response_url,
+                  log_payload.LazyJson(response, log_payload.redact_no_echo, self.log_payload_max_length))
+        return body
+
+    def send_response(self, response=None):
+        """
+        sends the response to `ResponseURL`, by default `self.response`.
+        """
+        url = self.response_url
+        body = self.encode_response(response)
+        response_transport = self.response_transport or transport.get_transport()
+
+        def put(max_timeout):
+            return response_transport.put(url, body, {'content-type': ''}, max_timeout=max_timeout)
+
+        self.delivery_result = delivery.deliver(url, put, self.response_retry_policy, self.context)
 
     """
     A JSON Schema which defines a proper CloudFormation response message
@@ -0,0 +1,69 @@
+"""
+encodes the response to CloudFormation, which rejects responses larger than 4096 bytes. A response
+which is too large either fails with a clear reason, or has its largest attributes removed.
+"""
+import json
+import logging
+
+log = logging.getLogger()
+
+MAX_RESPONSE_SIZE = 4096
+
+POLICIES = ("fail", "trim")
+
+
+def failed_response(request, reason):
+    """
+    returns a FAILED response with `reason` to the request or response `request`.
+    """
+    response = {
+        name: request[name]
+        for name in ("StackId", "RequestId", "LogicalResourceId", "PhysicalResourceId")
+        if name in request
+    }
+    response.update({"Status": "FAILED", "Reason": str(reason), "Data": {}})
+    return response
+
+
+def encode(response, max_size=MAX_RESPONSE_SIZE, policy="fail"):
+    """
+    returns the response to send and its JSON encoding in bytes. If the encoding of `response`
+    exceeds `max_size` bytes, the `policy` "fail" replaces it by a FAILED response, while "trim"
+    removes the largest attributes from the Data until it fits.
+    """
+    if policy not in POLICIES:
+        raise ValueError("unknown response size policy %s, expected one of %s" % (policy, ", ".join(POLICIES)))
+
+    body = json.dumps(response).encode("utf-8")
+    if max_size is None or len(body) <= max_size:
+        return response, body
+
+    if policy == "trim":
+        trimmed, body = trim(response, len(body), max_size)
+        if len(body) <= max_size:
+            return trimmed, body
+
+    log.error("response of %d bytes exceeds the limit of %d bytes", len(body), max_size)
+    failed = failed_response(response, "response of %d bytes exceeds the limit of %d bytes" % (len(body), max_size))
+    return failed, json.dumps(failed).encode("utf-8")
+
+
+def trim(response, size, max_size):
+    """
+    returns a copy of the response without its largest attributes, and its encoding.
+    """
+    data = response.get("Data") or {}
+    # the size of each attribute in the encoded Data, excluding the separator
+    sizes = sorted(((len(json.dumps({name: value})) - 2, name) for name, value in data.items()), reverse=True)
+
+    removed = []
+    for attribute_size, name in sizes:
+        if size <= max_size:
+            break
+        removed.append(name)
+        size -= attribute_size
+
+    trimmed = dict(response, Data={name: value for name, value in data.items() if name not in removed})
+    if removed:
+        log.warning("removed the attributes %s from the response, to stay within %d bytes", ", ".join(removed), max_size)
+    return trimmed, json.dumps(trimmed).encode("utf-8")
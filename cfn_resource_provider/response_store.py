@@ -0,0 +1,152 @@
+"""
+stores the responses sent for CloudFormation requests, so that a redelivered request can be answered
+with the recorded response instead of being executed again.
+"""
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from cfn_resource_provider.lazy_import import lazy_import
+
+sqlite3 = lazy_import("sqlite3")
+
+
+class ResponseStore(object):
+    """
+    base class of the response stores. Counts the number of `hits` and `misses` of `get`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """
+        returns the response stored under `key`, or None.
+        """
+        response = self._get(key)
+        with self._stats_lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def put(self, key, response):
+        """
+        stores the `response` under `key`.
+        """
+        self._put(key, response)
+
+    @property
+    def stats(self):
+        """
+        returns the hit and miss counters.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _get(self, key):
+        raise NotImplementedError()
+
+    def _put(self, key, response):
+        raise NotImplementedError()
+
+
+class MemoryResponseStore(ResponseStore):
+    """
+    keeps the `max_entries` most recently used responses in memory.
+    """
+
+    def __init__(self, max_entries=1024):
+        super(MemoryResponseStore, self).__init__()
+        self.max_entries = max_entries
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return copy.deepcopy(response)
+            return None
+
+    def _put(self, key, response):
+        with self._lock:
+            self._responses[key] = copy.deepcopy(response)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+
+    def __len__(self):
+        return len(self._responses)
+
+
+class SqliteResponseStore(ResponseStore):
+    """
+    stores the responses in a local SQLite database at `path`. Responses older than `max_age`
+    seconds are ignored and removed.
+    """
+
+    def __init__(self, path, max_age=24 * 60 * 60):
+        super(SqliteResponseStore, self).__init__()
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def _get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?", (key, time.time() - self.max_age)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, key, response):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                (key, json.dumps(response), now),
+            )
+            self._connection.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class DynamoDBResponseStore(ResponseStore):
+    """
+    stores the responses in a DynamoDB table, with a string partition key named `key_name`. `table` is a
+    boto3 DynamoDB Table resource. Responses older than `max_age` seconds are ignored; enable the DynamoDB
+    time to live on the attribute "ExpiresAt" to remove them.
+    """
+
+    def __init__(self, table, max_age=24 * 60 * 60, key_name="Key"):
+        super(DynamoDBResponseStore, self).__init__()
+        self.table = table
+        self.max_age = max_age
+        self.key_name = key_name
+
+    def _get(self, key):
+        item = self.table.get_item(Key={self.key_name: key}, ConsistentRead=True).get("Item")
+        if item is None or int(item["ExpiresAt"]) < time.time():
+            return None
+        return json.loads(item["Response"])
+
+    def _put(self, key, response):
+        self.table.put_item(
+            Item={
+                self.key_name: key,
+                "Response": json.dumps(response),
+                "ExpiresAt": int(time.time() + self.max_age),
+            }
+        )
@@ -0,0 +1,116 @@
+"""
+routes requests for multiple custom resource types to their providers, so that a single Lambda can
+handle them all.
+"""
+from typing import Any, Dict, Iterable, Optional, Type, Union
+
+from . import provider_pool
+from .resource_provider import ResourceProvider, custom_cfn_resource_name
+
+
+class UnsupportedResourceProvider(ResourceProvider):
+    """
+    fails requests for resource types which are not registered with the router.
+    """
+
+    reusable = False
+
+    def __init__(self, supported_resource_types: Iterable[str]) -> None:
+        super(UnsupportedResourceProvider, self).__init__()
+        self.supported_resource_types = sorted(supported_resource_types)
+
+    def is_supported_request(self) -> bool:
+        self.fail(
+            "ResourceType %s not supported, expected one of %s"
+            % (self.request.get("ResourceType"), ", ".join(self.supported_resource_types))
+        )
+        return False
+
+
+class ResourceProviderRouter(object):
+    """
+    dispatches each request to the provider class registered for its ResourceType. The router can
+    be used as Lambda handler, and in place of a provider class in the SnsEnvelope::
+
+        router = ResourceProviderRouter([SecretProvider, DatabaseProvider])
+
+        def handler(request, context):
+            return router.handle(request, context)
+    """
+
+    def __init__(self, providers: Optional[Iterable[Type[ResourceProvider]]] = None) -> None:
+        self.providers: Dict[str, Type[ResourceProvider]] = {}
+        for provider_class in providers or []:
+            self.register(provider_class)
+
+    def register(self, provider_class: Type[ResourceProvider]) -> Type[ResourceProvider]:
+        """
+        registers `provider_class` for the resource type it supports. Can be used as class decorator.
+        """
+        resource_type = self.resource_type_of(provider_class)
+        registered = self.providers.get(resource_type)
+        if registered is not None and registered is not provider_class:
+            raise ValueError(
+                "%s is already registered for %s by %s" % (provider_class.__name__, resource_type, registered.__name__)
+            )
+        self.providers[resource_type] = provider_class
+        return provider_class
+
+    @staticmethod
+    def resource_type_of(provider_class: Type[ResourceProvider]) -> str:
+        """
+        returns the resource type supported by `provider_class`. If the class overrides
+        `custom_cfn_resource_name`, an instance is created to obtain it.
+        """
+        if provider_class.custom_cfn_resource_name is ResourceProvider.custom_cfn_resource_name:
+            return custom_cfn_resource_name(provider_class)
+        return provider_class().custom_cfn_resource_name
+
+    def create_provider(self, request: dict) -> ResourceProvider:
+        """
+        returns a provider instance for the ResourceType of `request`, from the provider_pool.
+        """
+        provider_class = self.providers.get(request.get("ResourceType"))
+        if provider_class is None:
+            return UnsupportedResourceProvider(self.providers.keys())
+        return provider_pool.acquire(provider_class)
+
+    def handle(self, request: dict, context: Any) -> dict:
+        """
+        handles the CloudFormation request with the provider for its ResourceType.
+        """
+        provider = self.create_provider(request)
+        try:
+            require_synchronous(type(provider), "ResourceProviderRouter.handle")
+            return provider.handle(request, context)
+        finally:
+            provider_pool.release(provider)
+
+
+def create_provider(
+    resource_provider: Union[Type[ResourceProvider], ResourceProviderRouter], request: dict
+) -> ResourceProvider:
+    """
+    returns a provider instance to handle `request`, from `resource_provider`, a provider class or a router.
+    Release it to the provider_pool after the request was handled.
+    """
+    if isinstance(resource_provider, ResourceProviderRouter):
+        return resource_provider.create_provider(request)
+    return provider_pool.acquire(resource_provider)
+
+
+def require_synchronous(resource_provider: Union[Type[ResourceProvider], ResourceProviderRouter], handler: str) -> None:
+    """
+    raises a TypeError if `resource_provider`, a provider class or a router, has a provider class of which
+    `handle` is a coroutine, as the synchronous `handler` would return it without awaiting it.
+    """
+    if isinstance(resource_provider, ResourceProviderRouter):
+        provider_classes = list(resource_provider.providers.values())
+    else:
+        provider_classes = [resource_provider]
+    for provider_class in provider_classes:
+        if provider_class.is_async:
+            raise TypeError(
+                "%s is asynchronous and can not be handled by %s, use the AsyncSnsEnvelope"
+                % (provider_class.__name__, handler)
+            )
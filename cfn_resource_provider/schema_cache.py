@@ -0,0 +1,91 @@
+"""
+process-wide cache of objects compiled from JSON schemas, like validators.
+
+The cache is shared by all provider instances and survives warm Lambda invocations, so
+a schema is only compiled once per container, instead of once per request.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from cfn_resource_provider.lazy_import import lazy_import
+
+jsonschema = lazy_import("jsonschema")
+
+
+class SchemaCache(object):
+    """
+    caches the result of `factory(schema)`.
+
+    Lookups by schema identity are tried first. On a miss, the cache falls back on the canonical
+    JSON representation of the schema, so that providers which build their `request_schema` in the
+    constructor still share a single compiled object. Schemas are assumed not to be modified after
+    they have been used for validation.
+    """
+
+    def __init__(self, factory, max_identities=256):
+        self.factory = factory
+        self.max_identities = max_identities
+        self._by_identity = OrderedDict()
+        self._by_content = {}
+        self._lock = threading.Lock()
+
+    def get(self, schema):
+        """
+        returns the compiled object for `schema`, compiling it on first use.
+        """
+        entry = self._by_identity.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+
+        key = json.dumps(schema, sort_keys=True, default=repr)
+        with self._lock:
+            compiled = self._by_content.get(key)
+            if compiled is None:
+                compiled = self.factory(schema)
+                self._by_content[key] = compiled
+
+            # keep a reference to the schema, so that its id can not be reused while cached
+            self._by_identity[id(schema)] = (schema, compiled)
+            while len(self._by_identity) > self.max_identities:
+                self._by_identity.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        """
+        removes all compiled objects from the cache.
+        """
+        with self._lock:
+            self._by_identity.clear()
+            self._by_content.clear()
+
+    def __len__(self):
+        return len(self._by_content)
+
+
+def _create_validator(schema):
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+validator_cache = SchemaCache(_create_validator)
+
+
+def get_validator(schema):
+    """
+    returns the cached validator for `schema`. The schema is checked against its metaschema once, on
+    first use.
+    """
+    return validator_cache.get(schema)
+
+
+def validate(instance, schema):
+    """
+    validates `instance` against `schema`, like `jsonschema.validate`, but using a cached validator.
+    raises the best matching jsonschema.ValidationError if the instance is invalid.
+    """
+    error = jsonschema.exceptions.best_match(get_validator(schema).iter_errors(instance))
+    if error is not None:
+        raise error
+
@@ -0,0 +1,301 @@
+"""
+compiles a draft 4 JSON schema into specialised Python code, which validates an instance and
+inserts the default values of missing properties, like the default injecting validator.
+
+Keywords which cannot be compiled are validated by the default injecting validator, at the same
+position in the generated code. Schemas containing a "$ref" are not compiled at all. When the
+generated code finds the instance invalid, the instance is validated once more by the default
+injecting validator, so that the reported error is exactly the one jsonschema reports.
+"""
+import copy
+import logging
+import numbers
+import re
+
+from jsonschema import Draft4Validator
+
+from cfn_resource_provider import default_injecting_validator
+from cfn_resource_provider.schema_cache import SchemaCache
+
+log = logging.getLogger()
+
+TYPE_CHECKS = {
+    "array": "isinstance({0}, list)",
+    "boolean": "isinstance({0}, bool)",
+    "integer": "(isinstance({0}, int) and not isinstance({0}, bool))",
+    "null": "{0} is None",
+    "number": "(isinstance({0}, Number) and not isinstance({0}, bool))",
+    "object": "isinstance({0}, dict)",
+    "string": "isinstance({0}, str)",
+}
+
+
+class CompilationError(Exception):
+    """
+    raised when a schema cannot be compiled.
+    """
+
+    pass
+
+
+def contains_ref(schema):
+    """
+    returns true if `schema` contains a "$ref" anywhere.
+    """
+    if isinstance(schema, dict):
+        return "$ref" in schema or any(contains_ref(v) for v in schema.values())
+    if isinstance(schema, list):
+        return any(contains_ref(v) for v in schema)
+    return False
+
+
+def in_scalar_enum(instance, values):
+    """
+    returns true if `instance` equals one of the scalar `values`, where booleans are not
+    considered equal to numbers.
+    """
+    for value in values:
+        if isinstance(value, bool) == isinstance(instance, bool) and value == instance:
+            return True
+    return False
+
+
+class CodeGenerator(object):
+    """
+    generates the source of a function `check(instance)`, which returns true if the instance is
+    valid against the schema. Constants referenced by the code are stored in `namespace`.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.namespace = {"Number": numbers.Number, "in_scalar_enum": in_scalar_enum, "deepcopy": copy.deepcopy}
+        self.counter = 0
+
+    def name(self, prefix):
+        self.counter += 1
+        return "%s%d" % (prefix, self.counter)
+
+    def constant(self, value, prefix="c"):
+        name = self.name(prefix)
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def source(self, schema):
+        self.emit(0, "def check(x0):")
+        self.generate(schema, "x0", 1)
+        self.emit(1, "return True")
+        return "\n".join(self.lines) + "\n"
+
+    def generate(self, schema, var, indent):
+        if not isinstance(schema, dict):
+            raise CompilationError("schema is not an object: %r" % (schema,))
+        if "$ref" in schema:
+            raise CompilationError("$ref is not supported")
+
+        for keyword, value in schema.items():
+            if keyword not in Draft4Validator.VALIDATORS:
+                continue
+            generate_keyword = getattr(self, "keyword_%s" % keyword, None)
+            if generate_keyword is None or not generate_keyword(value, schema, var, indent):
+                self.interpreted({keyword: value}, var, indent)
+
+    def interpreted(self, schema, var, indent):
+        """
+        validates `var` against `schema` with the default injecting validator.
+        """
+        if contains_ref(schema):
+            raise CompilationError("$ref is not supported")
+        name = self.constant(default_injecting_validator.validator(schema), "v")
+        self.emit(indent, "if not %s.is_valid(%s): return False" % (name, var))
+
+    def keyword_type(self, value, schema, var, indent):
+        types = [value] if isinstance(value, str) else value
+        if not isinstance(types, list) or any(t not in TYPE_CHECKS for t in types):
+            return False
+        checks = " or ".join(TYPE_CHECKS[t].format(var) for t in types)
+        self.emit(indent, "if not (%s): return False" % (checks if checks else "False"))
+        return True
+
+    def keyword_properties(self, value, schema, var, indent):
+        if not all(isinstance(s, dict) for s in value.values()):
+            return False
+        if not value:
+            return True
+        self.emit(indent, "if isinstance(%s, dict):" % var)
+        for name, subschema in value.items():
+            if "default" not in subschema:
+                continue
+            default = self.constant(subschema["default"], "d")
+            if subschema["default"] is None or isinstance(subschema["default"], (str, int, float)):
+                self.emit(indent + 1, "%s.setdefault(%r, %s)" % (var, name, default))
+            else:
+                # a mutable default is copied, as the compiled schema is shared by all requests
+                self.emit(indent + 1, "if %r not in %s: %s[%r] = deepcopy(%s)" % (name, var, var, name, default))
+        for name, subschema in value.items():
+            item = self.name("x")
+            self.emit(indent + 1, "if %r in %s:" % (name, var))
+            self.emit(indent + 2, "%s = %s[%r]" % (item, var, name))
+            self.generate(subschema, item, indent + 2)
+        return True
+
+    def keyword_required(self, value, schema, var, indent):
+        if not value:
+            return True
+        checks = " and ".join("%r in %s" % (name, var) for name in value)
+        self.emit(indent, "if isinstance(%s, dict) and not (%s): return False" % (var, checks))
+        return True
+
+    def keyword_enum(self, value, schema, var, indent):
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            name = self.constant(frozenset(value), "e")
+            self.emit(indent, "if not (isinstance(%s, str) and %s in %s): return False" % (var, var, name))
+            return True
+        if isinstance(value, list) and all(v is None or isinstance(v, (str, bool, int, float)) for v in value):
+            name = self.constant(tuple(value), "e")
+            self.emit(indent, "if not in_scalar_enum(%s, %s): return False" % (var, name))
+            return True
+        return False
+
+    def keyword_format(self, value, schema, var, indent):
+        # the default injecting validator has no format checker
+        return True
+
+    def keyword_pattern(self, value, schema, var, indent):
+        name = self.constant(re.compile(value), "p")
+        self.emit(indent, "if isinstance(%s, str) and %s.search(%s) is None: return False" % (var, name, var))
+        return True
+
+    def keyword_minLength(self, value, schema, var, indent):
+        self.emit(indent, "if isinstance(%s, str) and len(%s) < %r: return False" % (var, var, value))
+        return True
+
+    def keyword_maxLength(self, value, schema, var, indent):
+        self.emit(indent, "if isinstance(%s, str) and len(%s) > %r: return False" % (var, var, value))
+        return True
+
+    def keyword_minimum(self, value, schema, var, indent):
+        operator = "<=" if schema.get("exclusiveMinimum", False) else "<"
+        self.emit(indent, "if %s and %s %s %r: return False" % (TYPE_CHECKS["number"].format(var), var, operator, value))
+        return True
+
+    def keyword_maximum(self, value, schema, var, indent):
+        operator = ">=" if schema.get("exclusiveMaximum", False) else ">"
+        self.emit(indent, "if %s and %s %s %r: return False" % (TYPE_CHECKS["number"].format(var), var, operator, value))
+        return True
+
+    def keyword_items(self, value, schema, var, indent):
+        if not isinstance(value, dict):
+            return False
+        item = self.name("x")
+        self.emit(indent, "if isinstance(%s, list):" % var)
+        self.emit(indent + 1, "for %s in %s:" % (item, var))
+        self.emit(indent + 2, "pass")
+        self.generate(value, item, indent + 2)
+        return True
+
+    def keyword_additionalItems(self, value, schema, var, indent):
+        # only applies to array valued "items", which are not compiled.
+        return isinstance(schema.get("items", {}), dict)
+
+    def keyword_minItems(self, value, schema, var, indent):
+        self.emit(indent, "if isinstance(%s, list) and len(%s) < %r: return False" % (var, var, value))
+        return True
+
+    def keyword_maxItems(self, value, schema, var, indent):
+        self.emit(indent, "if isinstance(%s, list) and len(%s) > %r: return False" % (var, var, value))
+        return True
+
+    def keyword_minProperties(self, value, schema, var, indent):
+        self.emit(indent, "if isinstance(%s, dict) and len(%s) < %r: return False" % (var, var, value))
+        return True
+
+    def keyword_maxProperties(self, value, schema, var, indent):
+        self.emit(indent, "if isinstance(%s, dict) and len(%s) > %r: return False" % (var, var, value))
+        return True
+
+    def keyword_additionalProperties(self, value, schema, var, indent):
+        if "patternProperties" in schema:
+            self.interpreted(
+                {
+                    "properties": {name: {} for name in schema.get("properties", {})},
+                    "patternProperties": schema["patternProperties"],
+                    "additionalProperties": value,
+                },
+                var,
+                indent,
+            )
+            return True
+        if value is True:
+            return True
+
+        known = self.constant(frozenset(schema.get("properties", {})), "k")
+        if value is False:
+            self.emit(indent, "if isinstance(%s, dict) and not %s.issuperset(%s): return False" % (var, known, var))
+            return True
+        if isinstance(value, dict):
+            name, item = self.name("n"), self.name("x")
+            self.emit(indent, "if isinstance(%s, dict):" % var)
+            self.emit(indent + 1, "for %s, %s in list(%s.items()):" % (name, item, var))
+            self.emit(indent + 2, "if %s in %s: continue" % (name, known))
+            self.generate(value, item, indent + 2)
+            return True
+        return False
+
+
+def compile_schema(schema):
+    """
+    returns the source and the compiled `check` function for `schema`.
+    raises CompilationError if the schema cannot be compiled.
+    """
+    generator = CodeGenerator()
+    try:
+        source = generator.source(schema)
+        code = compile(source, "<compiled request schema>", "exec")
+    except (SyntaxError, RecursionError) as e:
+        raise CompilationError(str(e))
+    namespace = dict(generator.namespace)
+    exec(code, namespace)
+    return source, namespace["check"]
+
+
+class CompiledValidator(object):
+    """
+    validates instances against a compiled schema, inserting default values when required.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.source = None
+        self._check = None
+        try:
+            self.source, self._check = compile_schema(schema)
+        except CompilationError as e:
+            log.debug("falling back on jsonschema to validate the request schema, %s", e)
+
+    @property
+    def is_compiled(self):
+        """
+        returns true if the schema was compiled into Python code.
+        """
+        return self._check is not None
+
+    def validate(self, instance):
+        """
+        validates the instance, raises jsonschema.ValidationError if it is invalid.
+        """
+        if self._check is not None and self._check(instance):
+            return
+        default_injecting_validator.validate(instance, self.schema)
+
+
+validator_cache = SchemaCache(CompiledValidator)
+
+
+def validate(obj, schema):
+    """
+    validates the object against the compiled schema, inserting default values when required
+    """
+    validator_cache.get(schema).validate(obj)
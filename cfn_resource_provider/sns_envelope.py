@@ -1,8 +1,22 @@
+import contextlib
 import json
-from typing import Any, List, Type
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Type, Union
 
-import jsonschema
+from .batch import BatchHandler
+from .lazy_import import lazy_import
 from .resource_provider import ResourceProvider
+from .response_encoder import failed_response
+from .response_store import ResponseStore
+from .router import ResourceProviderRouter, create_provider, require_synchronous
+from . import provider_pool, schema_cache
+
+jsonschema = lazy_import("jsonschema")
+
+log = logging.getLogger()
 
 SNS_SCHEMA = {
     "type": "object",
@@ -34,36 +48,181 @@ SNS_SCHEMA = {
 }
 
 
+def is_valid_sns_request(event: dict) -> bool:
+    """
+    returns true if `event` is a valid SNS event, otherwise logs the error and returns false.
+    """
+    try:
+        schema_cache.validate(event, SNS_SCHEMA)
+        return True
+    except jsonschema.ValidationError as e:
+        log.error('invalid SNS event received: %s', e.message)
+        return False
+
+
+def dedup_key(request: dict) -> str:
+    """
+    returns the key under which the response to `request` is stored in the dedup response store.
+    """
+    return "%s/%s" % (request.get("RequestId"), request.get("LogicalResourceId"))
+
+
 class SnsEnvelope(object):
     """
     When custom resources are SNS backed the CloudFormation event is wrapped within the SNS structure. To make
     it easier to process these custom resources we created an Envelope that can unpack the SNS messages.
     """
 
-    def __init__(self, resource_provider: Type[ResourceProvider]) -> None:
+    def __init__(
+        self,
+        resource_provider: Union[Type[ResourceProvider], ResourceProviderRouter],
+        max_workers: Optional[int] = None,
+        max_concurrency_per_type: Optional[int] = None,
+        dedup: Optional[ResponseStore] = None,
+        batch: bool = False,
+    ) -> None:
+        """
+        `resource_provider` is the provider class handling the requests, or a router which dispatches each
+        request to the provider class for its ResourceType.
+
+        when `max_workers` is greater than 1, the records are processed concurrently by a pool of
+        `max_workers` threads, with at most `max_concurrency_per_type` records of the same ResourceType
+        at the same time.
+
+        when a `dedup` response store is specified, the response to a request which was already handled
+        is replayed from the store, instead of executing the request again.
+
+        when `batch` is true, the requests in the payload are handled as one batch by the BatchHandler, which
+        passes the requests of the same provider and request type to its `create_many`, `update_many` or
+        `delete_many` hook.
+
+        an AsyncResourceProvider is rejected with a TypeError, use the AsyncSnsEnvelope instead.
+        """
+        require_synchronous(resource_provider, "SnsEnvelope")
         self.provider = resource_provider
+        self.dedup = dedup
+        self.batch = batch
+        self.max_workers = max_workers
+        self.max_concurrency_per_type = max_concurrency_per_type
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
 
     def handle(self, event: dict, context: Any) -> List[dict]:
         """
         SNS payloads can hold 1 or more messages, so we need to handle each message as a custom resource.
         """
-        if not self.__is_valid_sns_request(event):
+        return list(self.iter_handle(event, context))
+
+    def iter_handle(self, event: dict, context: Any) -> Iterator[dict]:
+        """
+        handles the messages in the SNS payload one by one, yielding each response as soon as it has been sent.
+        Messages are decoded when they are processed, and in concurrent mode at most 2 * `max_workers`
+        records are in flight, so memory use does not grow with the size of the payload.
+        """
+        if not is_valid_sns_request(event):
             raise Exception("The provided event is not compliant with the SNS schema.")
 
-        responses = []
+        records = event["Records"]
+        if self.batch:
+            yield from self._handle_batch(records, context)
+        elif self.max_workers and self.max_workers > 1 and len(records) > 1:
+            yield from self._iter_handle_concurrently(records, context)
+        else:
+            for record in records:
+                yield self.handle_request(self.decode(record), context)
 
-        for record in event["Records"]:
-            request = json.loads(record["Sns"]["Message"])
+    def _iter_handle_concurrently(self, records: List[dict], context: Any) -> Iterator[dict]:
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending: Deque[Future] = deque()
+            for record in records:
+                pending.append(executor.submit(self.handle_isolated, record, context))
+                if len(pending) >= 2 * self.max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-            responses.append(self.provider().handle(request, context))
+    def _handle_batch(self, records: List[dict], context: Any) -> List[dict]:
+        responses: List[Optional[dict]] = [None] * len(records)
+        requests: List[dict] = [{}] * len(records)
+        batch: List[int] = []
+        for i, record in enumerate(records):
+            request: dict = {}
+            try:
+                request = self.decode(record)
+                requests[i] = request
+            except Exception as e:
+                log.error("failed to decode record %d, %s", i, e)
+                responses[i] = failed_response(request, e)
+                continue
+            if self.dedup is not None:
+                responses[i] = self.dedup.get(dedup_key(request))
+                if responses[i] is not None:
+                    log.info("replaying response to duplicate request %s", dedup_key(request))
+                    continue
+            batch.append(i)
 
+        handled = BatchHandler(self.provider).handle_requests([requests[i] for i in batch], context)
+        for i, (response, sent) in zip(batch, handled):
+            responses[i] = response
+            if self.dedup is not None and sent:
+                self.dedup.put(dedup_key(requests[i]), response)
         return responses
 
+    def handle_request(self, request: dict, context: Any) -> dict:
+        """
+        handles a single CloudFormation request, or replays the response if it is a duplicate.
+        """
+        key = None
+        if self.dedup is not None:
+            key = dedup_key(request)
+            response = self.dedup.get(key)
+            if response is not None:
+                log.info("replaying response to duplicate request %s", key)
+                return response
+
+        provider = create_provider(self.provider, request)
+        try:
+            require_synchronous(type(provider), "SnsEnvelope")
+            response = provider.handle(request, context)
+            if key is not None and not provider.asynchronous:
+                self.dedup.put(key, response)
+            return response
+        finally:
+            provider_pool.release(provider)
+
+    @staticmethod
+    def decode(record: dict) -> dict:
+        """
+        returns the CloudFormation request in the SNS `record`.
+        """
+        return json.loads(record["Sns"]["Message"])
 
-    def __is_valid_sns_request(self, event: dict) -> bool:
+    def handle_isolated(self, record: dict, context: Any) -> dict:
+        """
+        handles a single record, returning a FAILED response instead of raising an exception, so that
+        a failing record does not affect the others.
+        """
+        request: dict = {}
         try:
-            jsonschema.validate(event, SNS_SCHEMA)
-            return True
-        except jsonschema.ValidationError as e:
-            self.fail('invalid CloudFormation Request received: %s' % str(e.context))
-            return False
\ No newline at end of file
+            request = self.decode(record)
+            with self._semaphore(request.get("ResourceType")):
+                return self.handle_request(request, context)
+        except Exception as e:
+            log.error("failed to handle request %s, %s", request.get("RequestId"), e)
+            return failed_response(request, e)
+
+    def _semaphore(self, resource_type: Optional[str]) -> Any:
+        """
+        returns the semaphore limiting the concurrency for `resource_type`.
+        """
+        if not self.max_concurrency_per_type:
+            return contextlib.nullcontext()
+        with self._lock:
+            semaphore = self._semaphores.get(resource_type)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrency_per_type)
+                self._semaphores[resource_type] = semaphore
+            return semaphore
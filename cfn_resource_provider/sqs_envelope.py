@@ -0,0 +1,92 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Type, Union
+
+from .resource_provider import ResourceProvider
+from .response_store import ResponseStore
+from .router import ResourceProviderRouter, require_synchronous
+from .sns_envelope import SnsEnvelope
+
+log = logging.getLogger()
+
+
+class SqsEnvelope(object):
+    """
+    handles the CloudFormation requests in a batch of SQS messages. The body of a message is either
+    an SNS notification wrapping the request, or the request itself, as sent with raw message delivery
+    or by the continuation.SqsScheduler.
+
+    `handle` returns the ids of the messages which could not be handled as `batchItemFailures`, so that
+    only those are retried. Enable ReportBatchItemFailures on the event source mapping to use it.
+    """
+
+    def __init__(
+        self,
+        resource_provider: Union[Type[ResourceProvider], ResourceProviderRouter],
+        max_workers: Optional[int] = None,
+        dedup: Optional[ResponseStore] = None,
+    ) -> None:
+        """
+        `resource_provider` is the provider class handling the requests, or a router which dispatches each
+        request to the provider class for its ResourceType.
+
+        when `max_workers` is greater than 1, the messages are handled concurrently by a pool of
+        `max_workers` threads.
+
+        when a `dedup` response store is specified, the response to a request which was already handled
+        is replayed from the store, instead of executing the request again.
+
+        an AsyncResourceProvider is rejected with a TypeError.
+        """
+        require_synchronous(resource_provider, "SqsEnvelope")
+        self.max_workers = max_workers
+        self.envelope = SnsEnvelope(resource_provider, dedup=dedup)
+
+    def handle(self, event: dict, context: Any) -> Dict[str, List[Dict[str, str]]]:
+        """
+        handles the messages in the SQS batch, and returns the failed messages as `batchItemFailures`.
+        """
+        records = event.get("Records") if isinstance(event, dict) else None
+        if not isinstance(records, list):
+            raise Exception("The provided event is not compliant with the SQS schema.")
+
+        if self.max_workers and self.max_workers > 1 and len(records) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                handled = list(executor.map(lambda record: self.handle_record(record, context), records))
+        else:
+            handled = [self.handle_record(record, context) for record in records]
+
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": record["messageId"]}
+                for record, ok in zip(records, handled)
+                if not ok and isinstance(record, dict) and "messageId" in record
+            ]
+        }
+
+    def handle_record(self, record: dict, context: Any) -> bool:
+        """
+        handles the request in the SQS `record`, and returns true if the record does not need to be retried.
+        """
+        try:
+            request = self.decode(record)
+            response = self.envelope.handle_request(request, context)
+            log.debug("handled message %s, %s", record.get("messageId"), response.get("Status"))
+            return True
+        except Exception as e:
+            message_id = record.get("messageId") if isinstance(record, dict) else None
+            log.error("failed to handle message %s, %s", message_id, e)
+            return False
+
+    @staticmethod
+    def decode(record: dict) -> dict:
+        """
+        returns the CloudFormation request in the SQS `record`.
+        """
+        body = json.loads(record["body"])
+        if isinstance(body, dict) and body.get("Type") == "Notification" and "Message" in body:
+            body = json.loads(body["Message"])
+        if not isinstance(body, dict) or "RequestType" not in body:
+            raise ValueError("message %s does not contain a CloudFormation request" % record.get("messageId"))
+        return body
@@ -0,0 +1,213 @@
+"""
+HTTP transports used to put the responses to the pre-signed ResponseURL.
+
+The transports keep a pool of keep-alive connections per host, which survives warm Lambda
+invocations, so consecutive responses to the same S3 endpoint do not pay for a new TCP and
+TLS handshake every time. The default transport only depends on the standard library; the
+`requests` based transport is available as an alternative.
+"""
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+from cfn_resource_provider.lazy_import import lazy_import
+
+http_client = lazy_import("http.client")
+ssl = lazy_import("ssl")
+requests = lazy_import("requests")
+
+
+class Response(object):
+    """
+    the status code and body text of the response to a put.
+    """
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+def cap_timeout(timeout, max_timeout):
+    """
+    returns `timeout`, a number or a (connect, read) tuple, with every value capped to `max_timeout`.
+    """
+    if max_timeout is None:
+        return timeout
+    if isinstance(timeout, tuple):
+        return tuple(min(t, max_timeout) if t is not None else max_timeout for t in timeout)
+    return min(timeout, max_timeout) if timeout is not None else max_timeout
+
+
+class Transport(object):
+    """
+    interface of the transports. Connection errors and timeouts are raised as OSError.
+    """
+
+    def put(self, url, body, headers, max_timeout=None):
+        """
+        puts the `body` bytes with `headers` to `url` and returns the Response. The timeouts are
+        capped to `max_timeout` seconds.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        closes all pooled connections.
+        """
+        pass
+
+
+class HttpClientTransport(Transport):
+    """
+    puts responses using `http.client`, keeping at most `pool_maxsize` idle connections per host.
+    `timeout` is the (connect, read) timeout in seconds.
+    """
+
+    def __init__(self, pool_maxsize=10, timeout=(3.05, 30)):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._pools = {}
+        self._ssl_context = None
+        self._lock = threading.Lock()
+
+    def put(self, url, body, headers, max_timeout=None):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        timeout = cap_timeout(self.timeout, max_timeout)
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+        connection = self._acquire(key)
+        if connection is not None:
+            try:
+                return self._put(key, connection, path, body, headers, read_timeout)
+            except (ConnectionError, http_client.BadStatusLine):
+                # the server may have closed the idle connection, retry on a new one.
+                pass
+
+        connection = self._connect(key, connect_timeout)
+        return self._put(key, connection, path, body, headers, read_timeout)
+
+    def _put(self, key, connection, path, body, headers, read_timeout):
+        try:
+            connection.sock.settimeout(read_timeout)
+            connection.request("PUT", path, body=body, headers=headers)
+            response = connection.getresponse()
+            text = response.read().decode("utf-8", "replace")
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        return Response(response.status, text)
+
+    def _connect(self, key, connect_timeout):
+        scheme, host, port = key
+        if scheme == "https":
+            connection = http_client.HTTPSConnection(host, port, timeout=connect_timeout, context=self.ssl_context)
+        elif scheme == "http":
+            connection = http_client.HTTPConnection(host, port, timeout=connect_timeout)
+        else:
+            raise ValueError("unsupported scheme %s" % scheme)
+        connection.connect()
+        return connection
+
+    @property
+    def ssl_context(self):
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    def _acquire(self, key):
+        with self._lock:
+            pool = self._pools.get(key)
+            return pool.pop() if pool else None
+
+    def _release(self, key, connection):
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            if len(pool) < self.pool_maxsize:
+                pool.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for connection in pool:
+                connection.close()
+
+
+class RequestsTransport(Transport):
+    """
+    puts responses using a pooled `requests.Session`.
+
+    `pool_connections` is the number of hosts for which connections are pooled, `pool_maxsize` the
+    maximum number of connections kept per host and `timeout` the (connect, read) timeout in seconds.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=(3.05, 30)):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        returns the session, creating it on first use.
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def put(self, url, body, headers, max_timeout=None):
+        r = self.session.put(url, data=body, headers=headers, timeout=cap_timeout(self.timeout, max_timeout))
+        return Response(r.status_code, r.text)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+default_transport = HttpClientTransport()
+
+
+def configure(pool_connections=10, pool_maxsize=10, timeout=(3.05, 30), backend="http.client"):
+    """
+    replaces the default transport with one of the `backend` "http.client" or "requests", using
+    the specified pool size and timeouts. `pool_connections` only applies to the requests backend.
+    """
+    global default_transport
+    if backend == "requests":
+        transport = RequestsTransport(pool_connections, pool_maxsize, timeout)
+    elif backend == "http.client":
+        transport = HttpClientTransport(pool_maxsize, timeout)
+    else:
+        raise ValueError("unknown transport backend %s, expected http.client or requests" % backend)
+
+    previous, default_transport = default_transport, transport
+    previous.close()
+    return default_transport
+
+
+def get_transport():
+    """
+    returns the default transport.
+    """
+    return default_transport
@@ -0,0 +1,171 @@
+"""
+converts the string values CloudFormation sends to the types declared in the request schema.
+
+The schema is compiled once into a coercion plan, which only visits the properties whose schema
+declares a boolean, integer or number type, or which contain such properties.
+"""
+import math
+import re
+
+from cfn_resource_provider.schema_cache import SchemaCache
+
+NUMBER = re.compile(r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+
+
+def is_int(s):
+    """
+    returns true, if the string is a proper decimal integer value. isdecimal accepts exactly the digits
+    int() accepts, while isdigit also accepts characters like superscripts.
+    """
+    if len(s) > 0 and s[0] in ('-', '+'):
+        return s[1:].isdecimal()
+    return s.isdecimal()
+
+
+def to_boolean(s):
+    if s == "true":
+        return True
+    if s == "false":
+        return False
+    return s
+
+
+def to_integer(s):
+    return int(s) if is_int(s) else s
+
+
+def to_number(s):
+    if is_int(s):
+        return int(s)
+    if NUMBER.match(s):
+        value = float(s)
+        if math.isfinite(value):
+            return value
+    return s
+
+
+SCALAR_CONVERSIONS = {"boolean": to_boolean, "integer": to_integer, "number": to_number}
+
+BUILDING = object()
+
+
+def resolve(schema, root):
+    """
+    returns the schema referenced by a local "$ref", or `schema` itself.
+    """
+    ref = schema.get("$ref") if isinstance(schema, dict) else None
+    if not isinstance(ref, str) or not ref.startswith("#"):
+        return schema
+    result = root
+    for token in [t for t in ref[1:].split("/") if t]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        if not isinstance(result, dict) or token not in result:
+            return {}
+        result = result[token]
+    return result
+
+
+class CoercionPlan(object):
+    """
+    a compiled coercion plan for a JSON schema. `convert(value)` returns the converted value,
+    modifying objects and arrays in place.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.convert = self.build(schema, schema, {}) or (lambda value: value)
+
+    def build(self, schema, root, built):
+        """
+        returns a function converting values valid against `schema`, or None if no conversion is required.
+        """
+        schema = resolve(schema, root)
+        if not isinstance(schema, dict):
+            return None
+
+        key = id(schema)
+        if key in built:
+            if built[key] is not BUILDING:
+                return built[key]
+            # a recursive reference to a schema which is still being built
+            return lambda value: built[key](value) if built[key] is not None else value
+
+        built[key] = BUILDING
+        built[key] = self.build_schema(schema, root, built)
+        return built[key]
+
+    def build_schema(self, schema, root, built):
+        types = schema.get("type", [])
+        types = [types] if isinstance(types, str) else list(types)
+
+        conversions = []
+        if "string" not in types:
+            conversions = [SCALAR_CONVERSIONS[t] for t in types if t in SCALAR_CONVERSIONS]
+        scalar = self.scalar_converter(conversions)
+
+        properties = []
+        for name, subschema in schema.get("properties", {}).items():
+            convert = self.build(subschema, root, built)
+            if convert is not None:
+                properties.append((name, convert))
+
+        additional = schema.get("additionalProperties")
+        additional = self.build(additional, root, built) if isinstance(additional, dict) else None
+        known = frozenset(schema.get("properties", {}))
+
+        items = schema.get("items")
+        items = self.build(items, root, built) if isinstance(items, dict) else None
+
+        all_of = [c for c in (self.build(s, root, built) for s in schema.get("allOf", [])) if c is not None]
+
+        if not (scalar or properties or additional or items or all_of):
+            return None
+
+        def convert(value):
+            if isinstance(value, dict):
+                for name, convert_property in properties:
+                    if name in value:
+                        value[name] = convert_property(value[name])
+                if additional is not None:
+                    for name in value:
+                        if name not in known:
+                            value[name] = additional(value[name])
+            elif isinstance(value, list):
+                if items is not None:
+                    for i, item in enumerate(value):
+                        value[i] = items(item)
+            elif isinstance(value, str):
+                if scalar is not None:
+                    value = scalar(value)
+            for convert_all in all_of:
+                value = convert_all(value)
+            return value
+
+        return convert
+
+    @staticmethod
+    def scalar_converter(conversions):
+        if not conversions:
+            return None
+        if len(conversions) == 1:
+            return conversions[0]
+
+        def convert(s):
+            for conversion in conversions:
+                value = conversion(s)
+                if value is not s:
+                    return value
+            return s
+
+        return convert
+
+
+plan_cache = SchemaCache(CoercionPlan)
+
+
+def convert_property_types(properties, schema):
+    """
+    converts the string values in `properties` to the types declared in `schema`, in place.
+    values which cannot be converted are left as is, so that the validator reports them.
+    """
+    return plan_cache.get(schema).convert(properties)
@@ -44,7 +44,8 @@ setup(
     include_package_data=True,
     zip_safe=False,
     platforms='any',
-    install_requires=['requests', 'jsonschema', 'requests[security]'],
+    install_requires=['jsonschema'],
+    extras_require={'requests': ['requests', 'requests[security]']},
     cmdclass={'test': PyTest},
     tests_require=['pytest'],
     author="Mark van Holsteijn",
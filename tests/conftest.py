@@ -0,0 +1,34 @@
+from uuid import uuid4
+
+import pytest
+
+from response_server import ResponseServer
+
+
+@pytest.fixture
+def response_server():
+    with ResponseServer() as server:
+        yield server
+
+
+def make_request(url, resource_type="Custom::Sample", request_type="Create", properties=None, **fields):
+    """
+    returns a CloudFormation request for `resource_type` with a unique RequestId, of which the response is put
+    to `url`. The keyword `fields`, like PhysicalResourceId, are added to the request.
+    """
+    request = {
+        "RequestType": request_type,
+        "ResponseURL": url,
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": resource_type,
+        "LogicalResourceId": "MyResource",
+        "ResourceProperties": properties if properties is not None else {},
+    }
+    request.update(fields)
+    return request
+
+
+@pytest.fixture
+def cfn_request():
+    return make_request
@@ -0,0 +1,64 @@
+"""
+a local stand-in for the pre-signed S3 ResponseURL, shared by the tests and the benchmarks.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ResponseServer(ThreadingHTTPServer):
+    """
+    records the responses put to `url` in `responses`, unless `record` is False. The status codes in
+    `status_codes` are returned in order, before falling back to 200.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, record=True):
+        super(ResponseServer, self).__init__(("127.0.0.1", 0), ResponseHandler)
+        self.record = record
+        self.connections = 0
+        self.count = 0
+        self.responses = []
+        self.status_codes = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/response" % self.server_address[1]
+
+    def next_status_code(self):
+        with self.lock:
+            return self.status_codes.pop(0) if self.status_codes else 200
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class ResponseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super(ResponseHandler, self).setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status_code = self.server.next_status_code()
+        if status_code == 200:
+            with self.server.lock:
+                self.server.count += 1
+                if self.server.record:
+                    self.server.responses.append(json.loads(body))
+        self.send_response(status_code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
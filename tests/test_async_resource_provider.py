@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from cfn_resource_provider import AsyncResourceProvider, AsyncSnsEnvelope, ResourceProvider, SnsEnvelope, SqsEnvelope
+from cfn_resource_provider.router import ResourceProviderRouter
+
+
+class TaggerProvider(AsyncResourceProvider):
+    def __init__(self):
+        super(TaggerProvider, self).__init__()
+        self.request_schema = {
+            "type": "object",
+            "required": ["Objects"],
+            "properties": {"Objects": {"type": "array", "items": {"type": "string"}}},
+        }
+
+    async def tag(self, name):
+        await asyncio.sleep(0.2)
+        return name
+
+    async def create(self):
+        tagged = await asyncio.gather(*[self.tag(name) for name in self.get("Objects")])
+        self.physical_resource_id = "tagged"
+        self.set_attribute("Count", len(tagged))
+
+    async def update(self):
+        raise ValueError("update failed")
+
+
+class SyncProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "sync"
+
+
+OBJECTS = {"Objects": ["a", "b", "c"]}
+
+
+def sns_event(requests):
+    return {"Records": [{"Sns": {"Message": json.dumps(r)}} for r in requests]}
+
+
+def test_create(response_server, cfn_request):
+    provider = TaggerProvider()
+    start = time.monotonic()
+    response = asyncio.run(provider.handle(cfn_request(response_server.url, "Custom::Tagger", properties=OBJECTS), {}))
+    assert time.monotonic() - start < 0.5, "tags must be applied concurrently"
+    assert response["Status"] == "SUCCESS", response["Reason"]
+    assert response["Data"] == {"Count": 3}
+    assert response_server.responses == [response]
+    assert provider.delivery_result.delivered
+
+
+def test_same_failure_semantics(response_server, cfn_request):
+    r = cfn_request(response_server.url, "Custom::Tagger", "Update", properties=OBJECTS, PhysicalResourceId="tagged")
+    response = asyncio.run(TaggerProvider().handle(r, {}))
+    assert response["Status"] == "FAILED"
+    assert response["Reason"] == "ValueError: update failed"
+
+    r = cfn_request(response_server.url, "Custom::Tagger", properties={}, PhysicalResourceId="tagged")
+    response = asyncio.run(TaggerProvider().handle(r, {}))
+    assert response["Status"] == "FAILED"
+    assert response["Reason"] == "invalid resource properties: 'Objects' is a required property"
+
+    r = cfn_request(response_server.url, "Custom::Tagger", properties={})
+    response = asyncio.run(TaggerProvider().handle(r, {}))
+    assert response["PhysicalResourceId"] == "could-not-create"
+
+    r = cfn_request(response_server.url, "Custom::Other", "Delete", PhysicalResourceId="tagged")
+    response = asyncio.run(TaggerProvider().handle(r, {}))
+    assert response["Status"] == "SUCCESS"
+    assert len(response_server.responses) == 4
+
+
+def test_asynchronous_does_not_send(response_server, cfn_request):
+    class Asynchronous(TaggerProvider):
+        async def create(self):
+            self.asynchronous = True
+
+    r = cfn_request(response_server.url, "Custom::Asynchronous", properties=OBJECTS)
+    response = asyncio.run(Asynchronous().handle(r, {}))
+    assert response["Status"] == "SUCCESS"
+    assert response_server.responses == []
+
+
+def test_sns_envelope_runs_records_concurrently(response_server, cfn_request):
+    requests = [cfn_request(response_server.url, "Custom::Tagger", properties=OBJECTS) for _ in range(10)]
+    start = time.monotonic()
+    responses = asyncio.run(AsyncSnsEnvelope(TaggerProvider).handle(sns_event(requests), {}))
+    assert time.monotonic() - start < 1.0
+    assert [r["RequestId"] for r in responses] == [r["RequestId"] for r in requests]
+    assert all(r["Status"] == "SUCCESS" for r in responses)
+    assert len(response_server.responses) == 10
+
+
+def test_sns_envelope_max_concurrency(response_server, cfn_request):
+    requests = [cfn_request(response_server.url, "Custom::Tagger", properties=OBJECTS) for _ in range(4)]
+    start = time.monotonic()
+    asyncio.run(AsyncSnsEnvelope(TaggerProvider, max_concurrency=2).handle(sns_event(requests), {}))
+    assert time.monotonic() - start >= 0.4
+
+
+def test_sns_envelope_isolates_failures_and_routes_sync_providers(response_server, cfn_request):
+    router = ResourceProviderRouter([TaggerProvider, SyncProvider])
+    tagger = cfn_request(response_server.url, "Custom::Tagger", properties=OBJECTS)
+    event = sns_event([tagger, cfn_request(response_server.url, "Custom::Sync")])
+    event["Records"].insert(1, {"Sns": {"Message": "not json"}})
+
+    responses = asyncio.run(AsyncSnsEnvelope(router).handle(event, {}))
+    assert [r["Status"] for r in responses] == ["SUCCESS", "FAILED", "SUCCESS"]
+    assert responses[2]["PhysicalResourceId"] == "sync"
+
+
+def test_sync_entry_points_reject_async_providers(response_server, cfn_request):
+    router = ResourceProviderRouter([TaggerProvider, SyncProvider])
+    for resource_provider in [TaggerProvider, router]:
+        for entry_point in [SnsEnvelope, SqsEnvelope]:
+            with pytest.raises(TypeError, match="TaggerProvider is asynchronous"):
+                entry_point(resource_provider)
+
+    with pytest.raises(TypeError, match="TaggerProvider is asynchronous"):
+        router.handle(cfn_request(response_server.url, "Custom::Tagger", properties=OBJECTS), {})
+    assert router.handle(cfn_request(response_server.url, "Custom::Sync"), {})["Status"] == "SUCCESS"
+    assert len(response_server.responses) == 1
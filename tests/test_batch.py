@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+from cfn_resource_provider import AsyncResourceProvider, ResourceProvider, SnsEnvelope
+from cfn_resource_provider.batch import BatchHandler
+from cfn_resource_provider.delivery import RetryPolicy
+from cfn_resource_provider.response_store import MemoryResponseStore
+from cfn_resource_provider.router import ResourceProviderRouter
+from cfn_resource_provider.sns_envelope import dedup_key
+
+
+class RecordProvider(ResourceProvider):
+    batches = []
+
+    def __init__(self):
+        super(RecordProvider, self).__init__()
+        self.request_schema = {
+            "type": "object",
+            "required": ["Name"],
+            "properties": {"Name": {"type": "string"}, "TTL": {"type": "integer", "default": 300}},
+        }
+
+    @classmethod
+    def create_many(cls, providers):
+        cls.batches.append(("Create", [p.get("Name") for p in providers]))
+        for provider in providers:
+            if provider.get("Name") == "bad":
+                provider.fail("bad record")
+            else:
+                provider.physical_resource_id = "record-%s" % provider.get("Name")
+                provider.set_attribute("TTL", provider.get("TTL"))
+
+    @classmethod
+    def delete_many(cls, providers):
+        raise ValueError("batch delete failed")
+
+    def update(self):
+        self.set_attribute("Updated", True)
+
+
+class ParameterProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "parameter"
+
+
+class AsyncRecordProvider(AsyncResourceProvider):
+    async def create(self):
+        self.physical_resource_id = "async"
+
+
+@pytest.fixture
+def record_request(cfn_request):
+    def record_request(url, name, request_type="Create", resource_type="Custom::Record"):
+        fields = {"PhysicalResourceId": "record-%s" % name} if request_type != "Create" else {}
+        properties = {"Name": name} if name is not None else {}
+        return cfn_request(url, resource_type, request_type, properties=properties, **fields)
+
+    return record_request
+
+
+def test_batch(response_server, record_request):
+    RecordProvider.batches = []
+    requests = [
+        record_request(response_server.url, "a"),
+        record_request(response_server.url, "b", "Update"),
+        record_request(response_server.url, "bad"),
+        record_request(response_server.url, None),
+        record_request(response_server.url, "c"),
+        record_request(response_server.url, "d", "Delete"),
+        {"RequestId": "incomplete"},
+    ]
+    responses = BatchHandler(RecordProvider).handle(requests, {})
+
+    assert RecordProvider.batches == [("Create", ["a", "bad", "c"])]
+    assert [r["Status"] for r in responses] == ["SUCCESS", "SUCCESS", "FAILED", "FAILED", "SUCCESS", "FAILED", "FAILED"]
+    assert responses[0]["PhysicalResourceId"] == "record-a"
+    assert responses[0]["Data"] == {"TTL": 300}
+    assert responses[1]["Data"] == {"Updated": True}
+    assert responses[2]["PhysicalResourceId"] == "could-not-create"
+    assert responses[3]["Reason"].startswith("invalid resource properties")
+    assert responses[5]["Reason"] == "ValueError: batch delete failed"
+    assert responses[6]["RequestId"] == "incomplete"
+    assert len(response_server.responses) == 6
+
+
+def test_sns_envelope_batch(response_server, record_request):
+    RecordProvider.batches = []
+    router = ResourceProviderRouter([RecordProvider, ParameterProvider])
+    requests = [
+        record_request(response_server.url, "a"),
+        record_request(response_server.url, "p", resource_type="Custom::Parameter"),
+        record_request(response_server.url, "b"),
+    ]
+    event = {"Records": [{"Sns": {"Message": json.dumps(r)}} for r in requests]}
+    event["Records"].append({"Sns": {"Message": "not json"}})
+    store = MemoryResponseStore()
+
+    responses = SnsEnvelope(router, batch=True, dedup=store).handle(event, {})
+    assert [r["Status"] for r in responses] == ["SUCCESS", "SUCCESS", "SUCCESS", "FAILED"]
+    assert responses[1]["PhysicalResourceId"] == "parameter"
+    assert RecordProvider.batches == [("Create", ["a", "b"])]
+
+    assert SnsEnvelope(router, batch=True, dedup=store).handle(event, {})[:3] == responses[:3]
+    assert RecordProvider.batches == [("Create", ["a", "b"])], "duplicates are replayed"
+
+
+def test_batch_rejects_async_providers(response_server, record_request):
+    with pytest.raises(TypeError, match="AsyncRecordProvider is asynchronous"):
+        BatchHandler(AsyncRecordProvider)
+
+    router = ResourceProviderRouter([RecordProvider])
+    handler = BatchHandler(router)
+    router.register(AsyncRecordProvider)
+    responses = handler.handle([record_request(response_server.url, "a", resource_type="Custom::AsyncRecord")], {})
+    assert responses[0]["Status"] == "FAILED"
+    assert "AsyncRecordProvider is asynchronous" in responses[0]["Reason"]
+    assert response_server.responses == [responses[0]], "the FAILED response must be sent"
+    assert responses[0]["PhysicalResourceId"] == "could-not-create"
+
+
+def test_sns_envelope_batch_does_not_store_undelivered_responses(record_request):
+    class UnreachableProvider(RecordProvider):
+        response_retry_policy = RetryPolicy(max_attempts=1)
+
+        def is_supported_resource_type(self):
+            return True
+
+    store = MemoryResponseStore()
+    r = record_request("http://127.0.0.1:1/", "a")
+    event = {"Records": [{"Sns": {"Message": json.dumps(r)}}]}
+
+    responses = SnsEnvelope(UnreachableProvider, batch=True, dedup=store).handle(event, {})
+    assert responses[0]["Status"] == "SUCCESS"
+    assert store.get(dedup_key(r)) is None
+
+
+class MeteredRecordProvider(RecordProvider):
+    reusable = True
+    emit_metrics = True
+    skip_unchanged_update = True
+    updates = []
+
+    @classmethod
+    def update_many(cls, providers):
+        cls.updates.append([p.get("Name") for p in providers])
+
+    def is_supported_resource_type(self):
+        return True
+
+
+def test_batch_metrics_and_skipped_updates(response_server, capsys, record_request):
+    def update(name, old_name):
+        r = record_request(response_server.url, name, "Update")
+        r["OldResourceProperties"] = {"Name": old_name}
+        return r
+
+    handler = BatchHandler(MeteredRecordProvider)
+    requests = [update("a", "a"), update("b", "old"), update("c", "c")]
+    responses = handler.handle(requests, {})
+    assert [r["Status"] for r in responses] == ["SUCCESS"] * 3
+    assert MeteredRecordProvider.updates == [["b"]]
+
+    requests = [update("d", "old")]
+    handler.handle(requests, {})
+    assert MeteredRecordProvider.updates == [["b"], ["d"]]
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    assert [r["RequestId"] for r in records[-4:]] == [r["RequestId"] for r in responses] + [requests[0]["RequestId"]]
+    assert all("set_request" in r and "send_response" in r for r in records[-4:])
+    assert "hook" in records[-3] and "hook" in records[-1]
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from cfn_resource_provider.clients import ClientRegistry
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+class FakeClient(object):
+    def __init__(self, service, **kwargs):
+        self.service = service
+        self.kwargs = kwargs
+
+
+class FakeFactory(object):
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, service, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return FakeClient(service, **kwargs)
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_clients_are_cached_per_arguments():
+    factory = FakeFactory()
+    registry = ClientRegistry(factory)
+    ssm = registry.get("ssm", region_name="eu-west-1")
+    assert registry.get("ssm", region_name="eu-west-1") is ssm
+    assert registry.get("ssm", region_name="us-east-1") is not ssm
+    assert registry.get("ssm", region_name="eu-west-1", config={"retries": [1, 2]}) is not ssm
+    assert registry.get("ssm", config={"retries": [1, 2]}, region_name="eu-west-1") is not ssm
+    assert factory.calls == 3
+    assert registry.stats == {"hits": 2, "misses": 3}
+    assert ssm.kwargs == {"region_name": "eu-west-1"}
+
+
+def test_ttl_eviction():
+    clock = Clock()
+    registry = ClientRegistry(FakeFactory(), ttl=60, clock=clock)
+    ssm = registry.get("ssm")
+    registry.get("s3")
+    clock.now = 59
+    assert registry.get("ssm") is ssm
+    clock.now = 60
+    assert registry.get("ssm") is not ssm
+    assert len(registry) == 1, "the expired s3 client is evicted"
+
+
+def test_invalidate():
+    registry = ClientRegistry(FakeFactory())
+    ssm, s3 = registry.get("ssm"), registry.get("s3")
+    registry.invalidate("ssm")
+    assert registry.get("s3") is s3
+    assert registry.get("ssm") is not ssm
+    registry.invalidate()
+    assert len(registry) == 0
+
+
+def test_concurrent_get_builds_once():
+    factory = FakeFactory(delay=0.1)
+    registry = ClientRegistry(factory)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(registry.get("ssm"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert factory.calls == 1
+    assert all(c is clients[0] for c in clients)
+
+
+def test_provider_get_client():
+    class ParameterProvider(ResourceProvider):
+        client_registry = ClientRegistry(FakeFactory())
+
+    client = ParameterProvider().get_client("ssm", region_name="eu-west-1")
+    assert isinstance(client, FakeClient)
+    assert ParameterProvider().get_client("ssm", region_name="eu-west-1") is client
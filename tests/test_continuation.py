@@ -0,0 +1,91 @@
+import time
+from uuid import uuid4
+
+from cfn_resource_provider.continuation import InProcessScheduler, SqsScheduler
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+class CertificateProvider(ResourceProvider):
+    scheduler = InProcessScheduler()
+    poll_interval = 0.05
+
+    def create(self):
+        if self.continuation_state is None:
+            self.physical_resource_id = "arn:aws:acm:certificate/%s" % uuid4()
+            self.in_progress({"Polls": 0})
+        elif self.continuation_state["Polls"] < 2:
+            self.in_progress({"Polls": self.continuation_state["Polls"] + 1})
+        else:
+            self.set_attribute("Attempts", self.continuation_attempt)
+
+    def update(self):
+        self.in_progress()
+        raise ValueError("update failed")
+
+
+def handler(request, context):
+    return CertificateProvider().handle(request, context)
+
+
+def test_continue_until_done(response_server, cfn_request):
+    scheduler = CertificateProvider.scheduler
+    provider = CertificateProvider()
+    provider.handle(cfn_request(response_server.url, "Custom::Certificate"), {})
+    assert provider.asynchronous
+    assert response_server.responses == [], "no response while in progress"
+    assert len(scheduler) == 1
+
+    start = time.monotonic()
+    responses = scheduler.run(handler)
+    assert time.monotonic() - start >= 0.15
+    assert len(responses) == 3
+
+    assert len(response_server.responses) == 1
+    response = response_server.responses[0]
+    assert response["Status"] == "SUCCESS", response["Reason"]
+    assert response["PhysicalResourceId"] == provider.physical_resource_id
+    assert response["Data"] == {"Attempts": 3}
+
+
+def test_failure_after_in_progress_is_sent(response_server, cfn_request):
+    response = handler(cfn_request(response_server.url, "Custom::Certificate", "Update"), {})
+    assert response["Status"] == "FAILED"
+    assert len(CertificateProvider.scheduler) == 0
+    assert response_server.responses == [response]
+
+
+def test_max_continuation_attempts(response_server, cfn_request):
+    class Limited(CertificateProvider):
+        max_continuation_attempts = 1
+
+        def is_supported_resource_type(self):
+            return True
+
+    scheduler = CertificateProvider.scheduler
+    Limited().handle(cfn_request(response_server.url, "Custom::Certificate"), {})
+    responses = scheduler.run(lambda r, c: Limited().handle(r, c), wait=False)
+    assert responses[-1]["Status"] == "FAILED"
+    assert responses[-1]["Reason"] == "Create of MyResource did not complete after 1 attempts"
+    assert response_server.responses == [responses[-1]]
+
+
+def test_in_progress_without_scheduler(response_server, cfn_request):
+    class Unscheduled(CertificateProvider):
+        scheduler = None
+
+        def is_supported_resource_type(self):
+            return True
+
+    response = Unscheduled().handle(cfn_request(response_server.url, "Custom::Certificate"), {})
+    assert response["Status"] == "FAILED"
+    assert "has no scheduler" in response["Reason"]
+
+
+def test_sqs_scheduler():
+    class Client(object):
+        def send_message(self, **kwargs):
+            self.message = kwargs
+
+    client = Client()
+    SqsScheduler(client, "https://sqs/queue").schedule({"RequestId": "1"}, 3600)
+    assert client.message == {"QueueUrl": "https://sqs/queue", "MessageBody": '{"RequestId": "1"}', "DelaySeconds": 900}
@@ -0,0 +1,87 @@
+import socket
+
+import pytest
+
+from cfn_resource_provider.delivery import DeliveryError, RetryPolicy
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+class SampleProvider(ResourceProvider):
+    response_retry_policy = RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.05)
+
+    def create(self):
+        self.physical_resource_id = "sample-provider-create"
+
+
+class Context(object):
+    def __init__(self, remaining_millis):
+        self.remaining_millis = remaining_millis
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_millis
+
+
+def test_retries_server_errors(response_server, cfn_request):
+    response_server.status_codes = [500, 503, 429]
+    provider = SampleProvider()
+    provider.handle(cfn_request(response_server.url), Context(60000))
+    assert provider.delivery_result.delivered
+    assert provider.delivery_result.attempts == 4
+    assert provider.delivery_result.status_code == 200
+    assert len(response_server.responses) == 1
+
+
+def test_client_errors_are_not_retried(response_server, cfn_request):
+    response_server.status_codes = [403]
+    provider = SampleProvider()
+    with pytest.raises(DeliveryError) as e:
+        provider.handle(cfn_request(response_server.url), {})
+    assert "status code 403" in str(e.value)
+    assert e.value.result.attempts == 1
+    assert not e.value.result.delivered
+
+
+def test_gives_up_after_max_attempts(response_server, cfn_request):
+    response_server.status_codes = [500] * 10
+    provider = SampleProvider()
+    with pytest.raises(DeliveryError) as e:
+        provider.handle(cfn_request(response_server.url), {})
+    assert e.value.result.attempts == 4
+    assert response_server.responses == []
+
+
+def test_connection_errors_are_retried(cfn_request):
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+
+    provider = SampleProvider()
+    with pytest.raises(DeliveryError) as e:
+        provider.handle(cfn_request("http://127.0.0.1:%d/response" % port), {})
+    assert e.value.result.attempts == 4
+    assert e.value.result.status_code is None
+
+
+def test_stops_before_the_deadline(response_server, cfn_request):
+    class FixedDelay(RetryPolicy):
+        def delay(self, attempt):
+            return 1.0
+
+    class SlowRetries(SampleProvider):
+        response_retry_policy = FixedDelay(max_attempts=10, deadline_margin=0.5)
+
+    response_server.status_codes = [500] * 10
+    provider = SlowRetries()
+    with pytest.raises(DeliveryError) as e:
+        provider.handle(cfn_request(response_server.url), Context(1000))
+    assert "no time left" in str(e.value)
+    assert e.value.result.attempts == 1
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= min(0.3, 0.1 * 2 ** (attempt - 1))
+    assert policy.is_retryable(502)
+    assert not policy.is_retryable(404)
@@ -0,0 +1,85 @@
+import time
+
+from cfn_resource_provider.response_store import DynamoDBResponseStore, MemoryResponseStore, SqliteResponseStore
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+class CounterProvider(ResourceProvider):
+    idempotency_store = MemoryResponseStore()
+    creates = 0
+
+    def create(self):
+        CounterProvider.creates += 1
+        self.physical_resource_id = "counter-%d" % CounterProvider.creates
+        self.set_attribute("Count", CounterProvider.creates)
+
+
+def test_repeated_request_is_replayed(response_server, cfn_request):
+    r = cfn_request(response_server.url, "Custom::Counter")
+    first = CounterProvider().handle(r, {})
+    creates = CounterProvider.creates
+
+    provider = CounterProvider()
+    second = provider.handle(r, {})
+    assert provider.replayed
+    assert CounterProvider.creates == creates
+    assert second == first
+    assert response_server.responses == [first, first], "the recorded response is sent again"
+
+    third = CounterProvider().handle(cfn_request(response_server.url, "Custom::Counter"), {})
+    assert third["PhysicalResourceId"] != first["PhysicalResourceId"]
+
+
+def test_failing_store_executes_the_request(response_server, cfn_request):
+    class BrokenStore(MemoryResponseStore):
+        def _get(self, key):
+            raise OSError("unavailable")
+
+        def _put(self, key, response):
+            raise OSError("unavailable")
+
+    class Provider(CounterProvider):
+        idempotency_store = BrokenStore()
+
+        def is_supported_resource_type(self):
+            return True
+
+    response = Provider().handle(cfn_request(response_server.url, "Custom::Counter"), {})
+    assert response["Status"] == "SUCCESS", response["Reason"]
+
+
+def test_sqlite_store(tmp_path, response_server, cfn_request):
+    class Provider(CounterProvider):
+        idempotency_store = SqliteResponseStore(str(tmp_path / "responses.db"))
+
+        def is_supported_resource_type(self):
+            return True
+
+    r = cfn_request(response_server.url, "Custom::Counter")
+    first = Provider().handle(r, {})
+    assert Provider().handle(r, {}) == first
+    assert Provider.idempotency_store.stats == {"hits": 1, "misses": 1}
+
+
+class Table(object):
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key, ConsistentRead):
+        item = self.items.get(Key["Key"])
+        return {"Item": item} if item else {}
+
+    def put_item(self, Item):
+        self.items[Item["Key"]] = Item
+
+
+def test_dynamodb_store():
+    table = Table()
+    store = DynamoDBResponseStore(table, max_age=60)
+    assert store.get("a") is None
+    store.put("a", {"Status": "SUCCESS"})
+    assert store.get("a") == {"Status": "SUCCESS"}
+    assert table.items["a"]["ExpiresAt"] > time.time()
+
+    table.items["a"]["ExpiresAt"] = int(time.time()) - 1
+    assert store.get("a") is None
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+"""
+cold start budget for importing the package, in milliseconds. Override with CFN_RESOURCE_PROVIDER_IMPORT_BUDGET_MS.
+"""
+IMPORT_BUDGET_MS = float(os.environ.get("CFN_RESOURCE_PROVIDER_IMPORT_BUDGET_MS", "100"))
+
+HEAVY_DEPENDENCIES = ["jsonschema", "requests", "urllib3", "charset_normalizer", "chardet", "sqlite3"]
+
+
+def import_times(statement):
+    """
+    returns the modules imported by `statement` in a fresh interpreter, with their own import time in microseconds.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us)))
+
+    names = [name for name, _ in times]
+    return times[names.index("cfn_resource_provider"):]
+
+
+def test_heavy_dependencies_are_imported_lazily():
+    statement = "from cfn_resource_provider import ResourceProvider, SnsEnvelope, ResourceProviderRouter"
+    imported = {name.split(".")[0] for name, _ in import_times(statement)}
+    assert imported.isdisjoint(HEAVY_DEPENDENCIES), imported & set(HEAVY_DEPENDENCIES)
+
+
+def test_import_time_budget():
+    statement = "from cfn_resource_provider import ResourceProvider, SnsEnvelope, ResourceProviderRouter"
+    # best of three, to reduce the noise of a busy machine
+    elapsed_ms = min(sum(us for _, us in import_times(statement)) for _ in range(3)) / 1000.0
+    assert elapsed_ms < IMPORT_BUDGET_MS, "importing the package took %.1fms, budget is %.1fms" % (
+        elapsed_ms,
+        IMPORT_BUDGET_MS,
+    )
+
+
+def test_dependencies_are_imported_on_first_use():
+    statement = "; ".join(
+        [
+            "import sys",
+            "from cfn_resource_provider import ResourceProvider",
+            "p = ResourceProvider()",
+            "assert 'jsonschema' not in sys.modules",
+            "p.set_request({'RequestType': 'Create', 'ResponseURL': 'https://localhost/', 'StackId': 's',"
+            " 'RequestId': 'r', 'ResourceType': 'Custom::Resource', 'LogicalResourceId': 'l',"
+            " 'ResourceProperties': {}}, {})",
+            "assert p.is_valid_cfn_request() and p.is_valid_request()",
+            "assert 'jsonschema' in sys.modules",
+        ]
+    )
+    assert import_times(statement)
@@ -0,0 +1,52 @@
+import logging
+from uuid import uuid4
+
+from cfn_resource_provider.log_payload import REDACTED, LazyJson, redact_no_echo
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+class Unserializable(object):
+    def __str__(self):
+        raise AssertionError("must not be serialized")
+
+
+def test_not_serialized_when_disabled(caplog):
+    caplog.set_level(logging.INFO)
+    logging.getLogger().debug("request %s", LazyJson({"Value": Unserializable()}))
+
+
+def test_max_length():
+    assert str(LazyJson({"a": "b"})) == '{"a": "b"}'
+    assert str(LazyJson({"a": "x" * 100}, max_length=10)) == '{"a": "xxx... (99 characters truncated)'
+    assert len(str(LazyJson({"a": "x" * 100}, max_length=None))) == 109
+
+
+def test_redact_no_echo():
+    response = {"Status": "SUCCESS", "NoEcho": True, "Data": {"Password": "secret"}}
+    assert redact_no_echo(response)["Data"] == {"Password": REDACTED}
+    assert response["Data"] == {"Password": "secret"}
+    assert redact_no_echo({"Data": {"Name": "a"}}) == {"Data": {"Name": "a"}}
+
+
+class SecretProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "secret"
+        self.no_echo = True
+        self.set_attribute("Password", "very-secret")
+
+
+def test_no_echo_response_is_redacted(response_server, caplog):
+    caplog.set_level(logging.DEBUG)
+    request = {
+        "RequestType": "Create",
+        "ResponseURL": response_server.url,
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": "Custom::Secret",
+        "LogicalResourceId": "MySecret",
+        "ResourceProperties": {"Name": "x" * 10000},
+    }
+    SecretProvider().handle(request, {})
+    assert "very-secret" not in caplog.text
+    assert "characters truncated" in caplog.text
+    assert response_server.responses[0]["Data"] == {"Password": "very-secret"}
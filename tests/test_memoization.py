@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from cfn_resource_provider import ResourceProvider, memoize
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+clock = Clock()
+
+
+class ZoneProvider(ResourceProvider):
+    lookups = []
+
+    @memoize(ttl=60, max_size=2, clock=clock)
+    def lookup_zone(self, name, private=False):
+        ZoneProvider.lookups.append(name)
+        return "zone-%s-%s" % (name, private)
+
+    @memoize()
+    def fail(self, name):
+        ZoneProvider.lookups.append(name)
+        raise ValueError(name)
+
+
+@pytest.fixture(autouse=True)
+def clear():
+    ZoneProvider.lookup_zone.cache_clear()
+    ZoneProvider.lookups = []
+    clock.now = 0.0
+
+
+def test_cache_is_shared_by_instances():
+    assert ZoneProvider().lookup_zone("a") == "zone-a-False"
+    assert ZoneProvider().lookup_zone("a") == "zone-a-False"
+    assert ZoneProvider().lookup_zone("a", private=True) == "zone-a-True"
+    assert ZoneProvider.lookups == ["a", "a"]
+    assert ZoneProvider.lookup_zone.stats == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_ttl_and_lru():
+    provider = ZoneProvider()
+    provider.lookup_zone("a")
+    provider.lookup_zone("b")
+    provider.lookup_zone("a")
+    provider.lookup_zone("c")
+    assert ZoneProvider.lookups == ["a", "b", "c"]
+    provider.lookup_zone("b")
+    assert ZoneProvider.lookups == ["a", "b", "c", "b"], "b was least recently used"
+
+    clock.now = 60
+    provider.lookup_zone("c")
+    assert ZoneProvider.lookups[-1] == "c", "c expired"
+
+
+def test_invalidate():
+    provider = ZoneProvider()
+    provider.lookup_zone("a")
+    provider.lookup_zone.invalidate("a")
+    provider.lookup_zone("a")
+    assert ZoneProvider.lookups == ["a", "a"]
+
+
+def test_exceptions_are_not_cached():
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            ZoneProvider().fail("x")
+    assert ZoneProvider.lookups == ["x", "x"]
+
+
+def test_single_flight():
+    calls = []
+
+    @memoize()
+    def slow(name):
+        calls.append(name)
+        time.sleep(0.1)
+        return name.upper()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow("a"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["a"]
+    assert results == ["A"] * 8
+    assert slow.stats == {"hits": 7, "misses": 1, "size": 1}
@@ -0,0 +1,74 @@
+import json
+import time
+
+from cfn_resource_provider import metrics
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+class MeteredProvider(ResourceProvider):
+    emit_metrics = True
+    metrics_namespace = "Test"
+
+    def create(self):
+        time.sleep(0.01)
+        self.physical_resource_id = "metered"
+
+    def update(self):
+        raise ValueError("failed")
+
+
+def emitted(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+
+
+def test_emits_phase_durations(response_server, capsys, cfn_request):
+    MeteredProvider().handle(cfn_request(response_server.url, "Custom::Metered"), {})
+    [record] = emitted(capsys)
+
+    directive = record["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == "Test"
+    assert directive["Dimensions"] == [["ResourceType", "RequestType"]]
+    names = [m["Name"] for m in directive["Metrics"]]
+    for phase in (
+        "set_request",
+        "is_supported_request",
+        "is_valid_cfn_request",
+        "convert_property_types",
+        "is_valid_request",
+        "hook",
+        "is_valid_cfn_response",
+        "send_response",
+        "Duration",
+        "Failed",
+    ):
+        assert phase in names
+        assert isinstance(record[phase], (int, float))
+
+    assert record["ResourceType"] == "Custom::Metered"
+    assert record["RequestType"] == "Create"
+    assert record["Status"] == "SUCCESS"
+    assert record["Failed"] == 0
+    assert record["hook"] >= 10.0
+    assert record["Duration"] >= record["hook"]
+
+
+def test_emits_failure(response_server, capsys, cfn_request):
+    request = cfn_request(response_server.url, "Custom::Metered", "Update", PhysicalResourceId="metered")
+    MeteredProvider().handle(request, {})
+    [record] = emitted(capsys)
+    assert record["Status"] == "FAILED"
+    assert record["Failed"] == 1
+
+
+def test_disabled_emits_nothing(response_server, capsys, cfn_request):
+    class Unmetered(MeteredProvider):
+        emit_metrics = False
+
+        def is_supported_resource_type(self):
+            return True
+
+    provider = Unmetered()
+    provider.handle(cfn_request(response_server.url, "Custom::Metered"), {})
+    assert emitted(capsys) == []
+    assert provider.metrics is metrics.disabled
+    assert provider.metrics.durations == {}
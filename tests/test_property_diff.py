@@ -0,0 +1,87 @@
+import pytest
+
+from cfn_resource_provider.property_diff import diff, format_path
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+def test_diff():
+    old = {"Name": "a", "Tags": [{"Key": "k", "Value": "1"}], "Size": 1, "Gone": True}
+    new = {"Name": "a", "Tags": [{"Key": "k", "Value": "2"}, {"Key": "x"}], "Size": "1", "New": {}}
+    assert sorted(diff(old, new), key=str) == sorted(
+        [("Tags", 0, "Value"), ("Tags", 1), ("Size",), ("Gone",), ("New",)], key=str
+    )
+    assert diff(old, old) == []
+    assert diff({"A": {"B": 1}}, {"A": []}) == [("A",)]
+    assert diff({"Value": 1}, {"Value": True}) == [("Value",)]
+    assert diff({"Tags": [{"V": 0}]}, {"Tags": [{"V": False}]}) == [("Tags", 0, "V")]
+    assert diff([1.0], [1]) == [(0,)]
+    assert format_path(("Tags", 0, "Value")) == "Tags/0/Value"
+
+
+class BucketProvider(ResourceProvider):
+    replacement_properties = ["Name"]
+    update_properties = ["Versioning"]
+    skip_unchanged_update = True
+
+    def __init__(self):
+        super(BucketProvider, self).__init__()
+        self.updates = 0
+        self.request_schema = {
+            "type": "object",
+            "properties": {
+                "Name": {"type": "string"},
+                "Versioning": {"type": "boolean", "default": False},
+                "Tags": {"type": "object"},
+            },
+        }
+
+    def convert_property_types(self):
+        self.schema_convert_property_types(self.properties)
+
+    def update(self):
+        self.updates += 1
+
+
+@pytest.fixture
+def execute(cfn_request):
+    def execute(old, new):
+        request = cfn_request(
+            "https://httpbin.org/put",
+            "Custom::Bucket",
+            "Update",
+            properties=new,
+            PhysicalResourceId="my-bucket",
+            OldResourceProperties=old,
+        )
+        provider = BucketProvider()
+        provider.set_request(request, {})
+        provider.execute()
+        assert provider.status == "SUCCESS", provider.reason
+        return provider
+
+    return execute
+
+
+def test_update_is_skipped_after_normalization(execute):
+    provider = execute({"Name": "a", "Versioning": "false"}, {"Name": "a"})
+    assert provider.changed_properties == []
+    assert provider.updates == 0
+    assert provider.old_properties == {"Name": "a", "Versioning": "false"}, "old properties are not modified"
+
+
+def test_irrelevant_change_is_skipped(execute):
+    provider = execute({"Name": "a", "Tags": {"a": "1"}}, {"Name": "a", "Tags": {"a": "2"}})
+    assert provider.changed_properties == [("Tags", "a")]
+    assert not provider.requires_update
+    assert provider.updates == 0
+
+
+def test_relevant_changes(execute):
+    provider = execute({"Name": "a"}, {"Name": "a", "Versioning": "true"})
+    assert provider.property_changed("Versioning")
+    assert not provider.requires_replacement
+    assert provider.updates == 1
+
+    provider = execute({"Name": "a"}, {"Name": "b"})
+    assert provider.requires_replacement
+    assert provider.updates == 1
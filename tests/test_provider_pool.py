@@ -0,0 +1,108 @@
+import json
+import threading
+
+from cfn_resource_provider import ResourceProvider, SnsEnvelope
+from cfn_resource_provider import provider_pool
+from cfn_resource_provider.provider_pool import ProviderPool
+
+
+class PooledProvider(ResourceProvider):
+    reusable = True
+    setups = 0
+    instances = 0
+
+    @classmethod
+    def setup(cls):
+        cls.setups += 1
+        cls.client = object()
+
+    def __init__(self):
+        super(PooledProvider, self).__init__()
+        PooledProvider.instances += 1
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def create(self):
+        self.physical_resource_id = "pooled"
+        self.set_attribute("Resets", self.resets)
+
+
+def sns_event(requests):
+    return {"Records": [{"Sns": {"Message": json.dumps(r)}} for r in requests]}
+
+
+def test_envelope_reuses_instances(response_server, cfn_request):
+    event = sns_event([cfn_request(response_server.url, "Custom::Pooled") for _ in range(5)])
+    responses = SnsEnvelope(PooledProvider).handle(event, {})
+    responses += SnsEnvelope(PooledProvider).handle(event, {})
+
+    assert all(r["Status"] == "SUCCESS" for r in responses)
+    assert PooledProvider.setups == 1
+    assert PooledProvider.instances == 1
+    assert [r["Data"]["Resets"] for r in responses] == list(range(1, 11))
+
+
+def test_concurrent_use_gets_distinct_instances(response_server, cfn_request):
+    barrier = threading.Barrier(4)
+
+    class ConcurrentProvider(PooledProvider):
+        def create(self):
+            barrier.wait(timeout=5)
+            super(ConcurrentProvider, self).create()
+
+        def is_supported_resource_type(self):
+            return True
+
+    event = sns_event([cfn_request(response_server.url, "Custom::Pooled") for _ in range(4)])
+    responses = SnsEnvelope(ConcurrentProvider, max_workers=4).handle(event, {})
+    assert all(r["Status"] == "SUCCESS" for r in responses)
+    assert provider_pool.get_pool(ConcurrentProvider).created == 4
+    assert len(provider_pool.get_pool(ConcurrentProvider)) == 4
+
+
+def test_instances_are_not_reused_by_default(response_server, cfn_request):
+    class FreshProvider(ResourceProvider):
+        instances = 0
+
+        def __init__(self):
+            super(FreshProvider, self).__init__()
+            FreshProvider.instances += 1
+
+        def create(self):
+            self.physical_resource_id = "fresh"
+
+    event = sns_event([cfn_request(response_server.url, "Custom::Fresh") for _ in range(3)])
+    responses = SnsEnvelope(FreshProvider).handle(event, {})
+    assert all(r["Status"] == "SUCCESS" for r in responses)
+    assert FreshProvider.instances == 3
+    assert len(provider_pool.get_pool(FreshProvider)) == 0
+
+
+def test_pool():
+    class Disposable(PooledProvider):
+        reusable = False
+
+    pool = ProviderPool(PooledProvider, max_idle=1)
+    a, b = pool.acquire(), pool.acquire()
+    assert a is not b
+    pool.release(a)
+    pool.release(b)
+    pool.release(Disposable())
+    assert len(pool) == 1
+    assert pool.acquire() is a
+
+    assert provider_pool.acquire(Disposable) is not provider_pool.acquire(Disposable)
+
+
+def test_failing_setup_fails_the_request(response_server, cfn_request):
+    class BrokenProvider(ResourceProvider):
+        @classmethod
+        def setup(cls):
+            raise ValueError("no credentials")
+
+    response = BrokenProvider().handle(cfn_request(response_server.url, "Custom::Broken"), {})
+    assert response["Status"] == "FAILED"
+    assert response["Reason"] == "ValueError: no credentials"
+    assert response["PhysicalResourceId"] == "could-not-create"
@@ -0,0 +1,84 @@
+import json
+from uuid import uuid4
+
+import pytest
+
+from cfn_resource_provider.response_encoder import encode
+from cfn_resource_provider.resource_provider import ResourceProvider
+
+
+def response(**data):
+    return {
+        "Status": "SUCCESS",
+        "Reason": "",
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-1",
+        "LogicalResourceId": "MyResource",
+        "PhysicalResourceId": "my-resource",
+        "Data": data,
+    }
+
+
+def test_small_response_is_encoded_once():
+    r = response(Name="a")
+    encoded, body = encode(r)
+    assert encoded is r
+    assert json.loads(body) == r
+
+
+def test_fail_policy():
+    encoded, body = encode(response(Large="x" * 5000))
+    assert json.loads(body) == encoded
+    assert encoded["Status"] == "FAILED"
+    assert encoded["Reason"].startswith("response of 5")
+    assert encoded["Reason"].endswith("bytes exceeds the limit of 4096 bytes")
+    assert encoded["Data"] == {}
+    assert encoded["PhysicalResourceId"] == "my-resource"
+
+
+def test_trim_policy_removes_largest_attributes():
+    r = response(Small="a", Large="x" * 3000, Medium="y" * 1000, Other="z" * 900)
+    encoded, body = encode(r, policy="trim")
+    assert len(body) <= 4096
+    assert encoded["Status"] == "SUCCESS"
+    assert set(encoded["Data"]) == {"Small", "Medium", "Other"}
+    assert set(r["Data"]) == {"Small", "Large", "Medium", "Other"}, "the original response is not modified"
+
+    encoded, body = encode(response(**{"A%d" % i: "x" * 100 for i in range(100)}), policy="trim")
+    assert len(body) <= 4096
+    assert 30 < len(encoded["Data"]) < 40
+
+
+def test_trim_policy_fails_when_data_does_not_suffice():
+    r = response()
+    r["Reason"] = "x" * 5000
+    encoded, _ = encode(r, policy="trim")
+    assert encoded["Status"] == "FAILED"
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        encode(response(), policy="ignore")
+
+
+class LargeProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "large"
+        self.set_attribute("Large", "x" * 5000)
+
+
+def test_provider_fails_fast(response_server):
+    request = {
+        "RequestType": "Create",
+        "ResponseURL": response_server.url,
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": "Custom::Large",
+        "LogicalResourceId": "MyLarge",
+        "ResourceProperties": {},
+    }
+    provider = LargeProvider()
+    response = provider.handle(request, {})
+    assert response["Status"] == "FAILED"
+    assert response_server.responses == [response]
+    assert provider.response is response
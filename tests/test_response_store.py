@@ -0,0 +1,69 @@
+import json
+import threading
+
+from cfn_resource_provider import SnsEnvelope
+from cfn_resource_provider.resource_provider import ResourceProvider
+from cfn_resource_provider.response_store import MemoryResponseStore, SqliteResponseStore
+
+
+class CountingProvider(ResourceProvider):
+    lock = threading.Lock()
+    created = 0
+
+    def create(self):
+        with self.lock:
+            CountingProvider.created += 1
+        self.physical_resource_id = "counted-%d" % CountingProvider.created
+
+
+def sns_wrap(requests):
+    return {"Records": [{"Sns": {"Message": json.dumps(r)}} for r in requests]}
+
+
+def test_memory_store_is_bounded_lru():
+    store = MemoryResponseStore(max_entries=2)
+    store.put("a", {"Status": "SUCCESS", "Data": {}})
+    store.put("b", {"Status": "SUCCESS", "Data": {}})
+    assert store.get("a") is not None
+    store.put("c", {"Status": "SUCCESS", "Data": {}})
+    assert store.get("b") is None, "least recently used response should be evicted"
+    assert store.get("c") is not None
+    assert len(store) == 2
+    assert store.stats == {"hits": 2, "misses": 1}
+
+    response = store.get("a")
+    response["Data"]["x"] = 1
+    assert store.get("a")["Data"] == {}, "stored responses must not be modified by callers"
+
+
+def test_sqlite_store(tmp_path):
+    path = str(tmp_path / "responses.db")
+    store = SqliteResponseStore(path)
+    assert store.get("a") is None
+    store.put("a", {"Status": "SUCCESS", "PhysicalResourceId": "id"})
+    store.close()
+
+    store = SqliteResponseStore(path)
+    assert store.get("a") == {"Status": "SUCCESS", "PhysicalResourceId": "id"}
+    assert store.stats == {"hits": 1, "misses": 0}
+
+    expired = SqliteResponseStore(path, max_age=-1)
+    assert expired.get("a") is None
+
+
+def test_envelope_replays_duplicates(response_server, cfn_request):
+    CountingProvider.created = 0
+    store = MemoryResponseStore()
+    envelope = SnsEnvelope(CountingProvider, dedup=store)
+
+    r1 = cfn_request(response_server.url, "Custom::Counting", RequestId="request-1")
+    responses = envelope.handle(sns_wrap([r1]), {})
+    assert responses[0]["PhysicalResourceId"] == "counted-1"
+
+    r2 = cfn_request(response_server.url, "Custom::Counting", RequestId="request-1", LogicalResourceId="Other")
+    responses = envelope.handle(sns_wrap([r1, r2]), {})
+    assert responses[0]["PhysicalResourceId"] == "counted-1", "duplicate should be replayed"
+    assert responses[1]["PhysicalResourceId"] == "counted-2"
+    assert CountingProvider.created == 2
+    assert len(response_server.responses) == 2
+    assert store.stats == {"hits": 1, "misses": 2}
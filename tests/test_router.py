@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from cfn_resource_provider import ResourceProvider, ResourceProviderRouter, SnsEnvelope
+
+
+class SecretProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "secret"
+
+
+class DatabaseProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "database"
+
+
+class RenamedProvider(ResourceProvider):
+    @property
+    def custom_cfn_resource_name(self):
+        return "Custom::Other"
+
+    def create(self):
+        self.physical_resource_id = "other"
+
+
+def test_register():
+    router = ResourceProviderRouter([SecretProvider, DatabaseProvider])
+
+    @router.register
+    class QueueProvider(ResourceProvider):
+        pass
+
+    router.register(RenamedProvider)
+    assert router.providers == {
+        "Custom::Secret": SecretProvider,
+        "Custom::Database": DatabaseProvider,
+        "Custom::Queue": QueueProvider,
+        "Custom::Other": RenamedProvider,
+    }
+
+    class Secret(ResourceProvider):
+        pass
+
+    with pytest.raises(ValueError):
+        router.register(Secret)
+
+
+def test_dispatch(response_server, cfn_request):
+    router = ResourceProviderRouter([SecretProvider, DatabaseProvider, RenamedProvider])
+    assert router.handle(cfn_request(response_server.url, "Custom::Secret"), {})["PhysicalResourceId"] == "secret"
+    assert router.handle(cfn_request(response_server.url, "Custom::Database"), {})["PhysicalResourceId"] == "database"
+    assert router.handle(cfn_request(response_server.url, "Custom::Other"), {})["PhysicalResourceId"] == "other"
+    assert len(response_server.responses) == 3
+
+
+def test_unsupported_resource_type(response_server, cfn_request):
+    router = ResourceProviderRouter([SecretProvider, DatabaseProvider])
+    response = router.handle(cfn_request(response_server.url, "Custom::Unknown"), {})
+    assert response["Status"] == "FAILED"
+    assert response["Reason"] == "ResourceType Custom::Unknown not supported, expected one of Custom::Database, Custom::Secret"
+    assert response["PhysicalResourceId"] == "could-not-create"
+
+    response = router.handle(cfn_request(response_server.url, "Custom::Unknown", "Delete"), {})
+    assert response["Status"] == "SUCCESS", "deletes of unsupported resources must not hang the stack"
+
+
+def test_sns_envelope_with_router(response_server, cfn_request):
+    router = ResourceProviderRouter([SecretProvider, DatabaseProvider])
+    requests = [cfn_request(response_server.url, t) for t in ["Custom::Database", "Custom::Secret"]]
+    event = {"Records": [{"Sns": {"Message": json.dumps(r)}} for r in requests]}
+    responses = SnsEnvelope(router).handle(event, {})
+    assert [r["PhysicalResourceId"] for r in responses] == ["database", "secret"]
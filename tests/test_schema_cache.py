@@ -0,0 +1,88 @@
+import copy
+from uuid import uuid4
+
+import jsonschema
+import pytest
+
+from cfn_resource_provider import default_injecting_validator, schema_cache
+from cfn_resource_provider.resource_provider import ResourceProvider
+from cfn_resource_provider.schema_cache import SchemaCache
+
+
+def test_cache_by_identity_and_content():
+    compiled = []
+
+    def factory(schema):
+        compiled.append(schema)
+        return object()
+
+    cache = SchemaCache(factory)
+    schema = {"type": "object", "properties": {"Name": {"type": "string"}}}
+    v1 = cache.get(schema)
+    assert cache.get(schema) is v1
+    assert cache.get(copy.deepcopy(schema)) is v1, "equal schemas should share a compiled object"
+    assert len(compiled) == 1
+    assert len(cache) == 1
+
+    v2 = cache.get({"type": "string"})
+    assert v2 is not v1
+    assert len(compiled) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get(schema) is not v1
+
+
+def test_identity_cache_is_bounded():
+    cache = SchemaCache(lambda s: object(), max_identities=4)
+    for i in range(10):
+        cache.get({"type": "object", "minProperties": i})
+    assert len(cache._by_identity) == 4
+    assert len(cache) == 10
+
+
+def test_validate_reports_best_match():
+    schema = {"type": "object", "required": ["Name"]}
+    schema_cache.validate({"Name": "x"}, schema)
+    with pytest.raises(jsonschema.ValidationError) as e:
+        schema_cache.validate({}, schema)
+    assert e.value.message == "'Name' is a required property"
+
+
+def test_invalid_schema_is_rejected():
+    with pytest.raises(jsonschema.SchemaError):
+        schema_cache.validate({}, {"type": "no-such-type"})
+
+
+def test_default_injecting_validator_is_shared():
+    schema = {"type": "object", "properties": {"Length": {"type": "integer", "default": 30}}}
+    properties = {}
+    default_injecting_validator.validate(properties, schema)
+    assert properties == {"Length": 30}
+
+    validator = default_injecting_validator.validator_cache.get(schema)
+    properties = {}
+    default_injecting_validator.validate(properties, copy.deepcopy(schema))
+    assert properties == {"Length": 30}
+    assert default_injecting_validator.validator_cache.get(copy.deepcopy(schema)) is validator
+
+
+def test_providers_share_cfn_validators():
+    request = {
+        "RequestType": "Create",
+        "ResponseURL": "https://httpbin.org/put",
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": "Custom::Resource",
+        "LogicalResourceId": "MyCustomResource",
+        "ResourceProperties": {"Name": "bla"},
+    }
+    for _ in range(2):
+        provider = ResourceProvider()
+        provider.set_request(request, {})
+        assert provider.is_valid_cfn_request(), provider.reason
+        assert provider.is_valid_cfn_response()
+
+    assert schema_cache.get_validator(ResourceProvider.cfn_request_schema) is schema_cache.get_validator(
+        copy.deepcopy(ResourceProvider.cfn_request_schema)
+    )
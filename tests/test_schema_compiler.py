@@ -0,0 +1,165 @@
+import copy
+from uuid import uuid4
+
+import jsonschema
+import pytest
+
+from cfn_resource_provider import default_injecting_validator, schema_compiler
+from cfn_resource_provider.resource_provider import ResourceProvider
+from cfn_resource_provider.schema_compiler import CompiledValidator
+
+secret_schema = {
+    "type": "object",
+    "required": ["Name"],
+    "properties": {
+        "Name": {"type": "string", "minLength": 1, "maxLength": 10, "pattern": "^[a-zA-Z0-9_/]+$"},
+        "Description": {"type": "string", "default": ""},
+        "ReturnSecret": {"type": "boolean", "default": False},
+        "Length": {"type": "integer", "minimum": 1, "maximum": 512, "default": 30},
+        "Ratio": {"type": "number", "minimum": 0, "exclusiveMinimum": True},
+        "Policy": {"type": "string", "enum": ["Retain", "Drop"], "default": "Retain"},
+        "Port": {"enum": [80, 443, None]},
+        "Tags": {
+            "type": "array",
+            "maxItems": 2,
+            "items": {
+                "type": "object",
+                "required": ["Key"],
+                "additionalProperties": False,
+                "properties": {"Key": {"type": "string"}, "Value": {"type": "string", "default": "-"}},
+            },
+        },
+        "Labels": {"type": "object", "additionalProperties": {"type": "string"}},
+        "Either": {"type": ["string", "null"]},
+        "Choice": {"oneOf": [{"type": "string"}, {"type": "integer"}]},
+    },
+}
+
+instances = [
+    {"Name": "secret"},
+    {},
+    {"Name": ""},
+    {"Name": "far-too-long-a-name"},
+    {"Name": "in valid"},
+    {"Name": 1},
+    {"Name": "x", "Length": 0},
+    {"Name": "x", "Length": "30"},
+    {"Name": "x", "Length": True},
+    {"Name": "x", "Length": 30.0},
+    {"Name": "x", "Ratio": 0},
+    {"Name": "x", "Ratio": 0.1},
+    {"Name": "x", "Policy": "Keep"},
+    {"Name": "x", "Port": 443},
+    {"Name": "x", "Port": None},
+    {"Name": "x", "Port": True},
+    {"Name": "x", "Port": "80"},
+    {"Name": "x", "Tags": [{"Key": "a"}, {"Key": "b", "Value": "c"}]},
+    {"Name": "x", "Tags": [{"Key": "a"}, {"Key": "b"}, {"Key": "c"}]},
+    {"Name": "x", "Tags": [{"Value": "a"}]},
+    {"Name": "x", "Tags": [{"Key": "a", "Other": 1}]},
+    {"Name": "x", "Labels": {"a": "b"}},
+    {"Name": "x", "Labels": {"a": 1}},
+    {"Name": "x", "Either": None},
+    {"Name": "x", "Either": 1},
+    {"Name": "x", "Choice": 1},
+    {"Name": "x", "Choice": 1.5},
+    [],
+]
+
+
+def interpreted_error(instance, schema):
+    try:
+        default_injecting_validator.validator(schema).validate(instance)
+        return None
+    except jsonschema.ValidationError as e:
+        return e.message
+
+
+@pytest.mark.parametrize("instance", instances)
+def test_compiled_is_equivalent(instance):
+    validator = CompiledValidator(secret_schema)
+    assert validator.is_compiled, validator.source
+
+    expected = copy.deepcopy(instance)
+    expected_error = interpreted_error(expected, secret_schema)
+
+    actual = copy.deepcopy(instance)
+    try:
+        validator.validate(actual)
+        actual_error = None
+    except jsonschema.ValidationError as e:
+        actual_error = e.message
+
+    assert actual_error == expected_error
+    if expected_error is None:
+        assert actual == expected
+
+
+def test_defaults_are_injected_before_required():
+    schema = {
+        "type": "object",
+        "properties": {"Name": {"type": "string", "default": "x"}},
+        "required": ["Name"],
+    }
+    instance = {}
+    schema_compiler.validate(instance, schema)
+    assert instance == {"Name": "x"}
+
+
+@pytest.mark.parametrize("validate", [schema_compiler.validate, default_injecting_validator.validate])
+def test_mutable_defaults_are_not_shared(validate):
+    def schema():
+        return {
+            "type": "object",
+            "properties": {"Tags": {"type": "array", "default": []}, "Options": {"default": {"Retain": False}}},
+        }
+
+    first, second = {}, {}
+    validate(first, schema())
+    first["Tags"].append("first")
+    first["Options"]["Retain"] = True
+    validate(second, schema())
+    assert second == {"Tags": [], "Options": {"Retain": False}}
+
+
+def test_ref_falls_back_on_jsonschema():
+    schema = {
+        "type": "object",
+        "properties": {"Database": {"$ref": "#/definitions/connection"}},
+        "definitions": {
+            "connection": {"type": "object", "properties": {"Port": {"type": "integer", "default": 3306}}}
+        },
+    }
+    validator = CompiledValidator(schema)
+    assert not validator.is_compiled
+    instance = {"Database": {}}
+    validator.validate(instance)
+    assert instance == {"Database": {"Port": 3306}}
+
+
+def test_provider_reports_same_error():
+    class TestSecretProvider(ResourceProvider):
+        compile_request_schema = True
+
+        def __init__(self):
+            super(TestSecretProvider, self).__init__()
+            self.request_schema = copy.deepcopy(secret_schema)
+
+    request = {
+        "RequestType": "Create",
+        "ResponseURL": "https://httpbin.org/put",
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": "Custom::TestSecret",
+        "LogicalResourceId": "MySecret",
+        "ResourceProperties": {"Name": "bla"},
+    }
+    provider = TestSecretProvider()
+    provider.set_request(request, {})
+    assert provider.is_valid_request(), provider.reason
+    assert provider.get("Length") == 30
+
+    del request["ResourceProperties"]["Name"]
+    provider.set_request(request, {})
+    assert not provider.is_valid_request()
+    assert provider.reason == "invalid resource properties: 'Name' is a required property"
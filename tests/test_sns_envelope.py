@@ -1,4 +1,6 @@
 import json
+import threading
+import time
 from typing import List
 from uuid import uuid4
 
@@ -86,3 +88,105 @@ def test_invalid_payload() -> None:
     with pytest.raises(Exception):
         provider.handle({"Records": [{"Sns": {"Foo": "Bar"}}]}, {})
 
+
+
+class SlowProvider(ResourceProvider):
+    lock = threading.Lock()
+    running = {}
+    max_running = {}
+
+    def create(self) -> None:
+        with self.lock:
+            self.running[self.resource_type] = self.running.get(self.resource_type, 0) + 1
+            self.max_running[self.resource_type] = max(
+                self.max_running.get(self.resource_type, 0), self.running[self.resource_type]
+            )
+        time.sleep(0.2)
+        with self.lock:
+            self.running[self.resource_type] -= 1
+        if self.get("Name") == "fail":
+            raise ValueError("failed to create")
+        self.physical_resource_id = "slow-%s" % self.get("Name")
+
+    def is_supported_resource_type(self) -> bool:
+        return True
+
+
+def test_concurrent_records_keep_order(response_server) -> None:
+    requests = [Request("Create", "r%d" % i) for i in range(6)]
+    for request in requests:
+        request["ResponseURL"] = response_server.url
+    requests[2]["ResourceProperties"]["Name"] = "fail"
+
+    envelope = SnsEnvelope(SlowProvider, max_workers=6)
+    start = time.monotonic()
+    responses = envelope.handle(sns_wrap(requests), {})
+    assert time.monotonic() - start < 0.2 * 6 / 2
+
+    assert [r["RequestId"] for r in responses] == [r["RequestId"] for r in requests]
+    assert responses[0]["PhysicalResourceId"] == "slow-r0"
+    assert responses[2]["Status"] == "FAILED"
+    assert responses[2]["Reason"] == "ValueError: failed to create"
+    assert all(r["Status"] == "SUCCESS" for i, r in enumerate(responses) if i != 2)
+    assert len(response_server.responses) == 6
+
+
+def test_concurrent_records_isolate_exceptions() -> None:
+    requests = [Request("Create", "r1"), Request("Create", "r2")]
+    requests[0]["ResponseURL"] = "http://127.0.0.1:1/unreachable"
+    requests[0]["ResourceType"] = "Custom::Unknown"
+
+    class NoSend(SlowProvider):
+        def send_response(self, response=None) -> None:
+            if self.resource_type == "Custom::Unknown":
+                raise Exception("failed to send")
+
+    responses = SnsEnvelope(NoSend, max_workers=2).handle(sns_wrap(requests), {})
+    assert responses[0]["Status"] == "FAILED"
+    assert responses[0]["Reason"] == "failed to send"
+    assert responses[1]["Status"] == "SUCCESS"
+
+
+def test_concurrency_per_resource_type(response_server) -> None:
+    requests = [Request("Create", "r%d" % i) for i in range(4)]
+    for i, request in enumerate(requests):
+        request["ResponseURL"] = response_server.url
+        request["ResourceType"] = "Custom::Capped" if i % 2 else "Custom::Other"
+
+    SlowProvider.max_running.clear()
+    responses = SnsEnvelope(SlowProvider, max_workers=4, max_concurrency_per_type=1).handle(sns_wrap(requests), {})
+    assert all(r["Status"] == "SUCCESS" for r in responses)
+    assert SlowProvider.max_running == {"Custom::Capped": 1, "Custom::Other": 1}
+
+
+def test_iter_handle_yields_responses_incrementally(response_server) -> None:
+    requests = [Request("Create", "r%d" % i) for i in range(3)]
+    for request in requests:
+        request["ResponseURL"] = response_server.url
+
+    responses = SnsEnvelope(SampleProvider).iter_handle(sns_wrap(requests), {})
+    first = next(responses)
+    assert first["RequestId"] == requests[0]["RequestId"]
+    assert len(response_server.responses) == 1, "the next record must not be processed before it is requested"
+    assert [r["RequestId"] for r in responses] == [r["RequestId"] for r in requests[1:]]
+    assert len(response_server.responses) == 3
+
+
+def test_iter_handle_concurrently(response_server) -> None:
+    requests = [Request("Create", "r%d" % i) for i in range(10)]
+    for request in requests:
+        request["ResponseURL"] = response_server.url
+    event = sns_wrap(requests)
+    event["Records"][4]["Sns"]["Message"] = "not json"
+
+    responses = list(SnsEnvelope(SlowProvider, max_workers=2).iter_handle(event, {}))
+    assert len(responses) == 10
+    assert responses[4]["Status"] == "FAILED"
+    assert [r["RequestId"] for i, r in enumerate(responses) if i != 4] == [
+        r["RequestId"] for i, r in enumerate(requests) if i != 4
+    ]
+
+
+def test_iter_handle_invalid_payload() -> None:
+    with pytest.raises(Exception):
+        next(SnsEnvelope(SampleProvider).iter_handle({}, {}))
@@ -0,0 +1,72 @@
+import json
+
+from cfn_resource_provider import ResourceProvider, SqsEnvelope
+from cfn_resource_provider.continuation import SqsScheduler
+
+
+class QueueProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "queued-%s" % self.get("Name")
+
+
+def sns_in_sqs(r):
+    return json.dumps({"Type": "Notification", "MessageId": "sns-1", "Message": json.dumps(r)})
+
+
+def event(*bodies):
+    return {"Records": [{"messageId": "m%d" % i, "body": body} for i, body in enumerate(bodies)]}
+
+
+def test_partial_batch_failures(response_server, cfn_request):
+    e = event(
+        json.dumps(cfn_request(response_server.url, "Custom::Queue", properties={"Name": "raw"})),
+        sns_in_sqs(cfn_request(response_server.url, "Custom::Queue", properties={"Name": "sns"})),
+        "not json",
+        json.dumps({"unrelated": True}),
+        json.dumps(cfn_request("http://127.0.0.1:1/unreachable", "Custom::Queue", properties={"Name": "a"})),
+    )
+    e["Records"].append({"body": "no message id"})
+
+    result = SqsEnvelope(QueueProvider).handle(e, {})
+    assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}, {"itemIdentifier": "m3"}, {"itemIdentifier": "m4"}]}
+    assert sorted(r["PhysicalResourceId"] for r in response_server.responses) == ["queued-raw", "queued-sns"]
+
+
+def test_failed_response_is_not_retried(response_server, cfn_request):
+    r = cfn_request(response_server.url, "Custom::Queue", properties={"Name": "a"})
+    r["ResourceType"] = "Custom::Other"
+    assert SqsEnvelope(QueueProvider).handle(event(json.dumps(r)), {}) == {"batchItemFailures": []}
+    assert response_server.responses[0]["Status"] == "FAILED"
+
+
+def test_concurrent(response_server, cfn_request):
+    requests = [cfn_request(response_server.url, "Custom::Queue", properties={"Name": str(i)}) for i in range(8)]
+    bodies = [json.dumps(r) for r in requests]
+    assert SqsEnvelope(QueueProvider, max_workers=4).handle(event(*bodies), {}) == {"batchItemFailures": []}
+    assert len(response_server.responses) == 8
+
+
+def test_continuation_from_sqs_scheduler(response_server, cfn_request):
+    class Client(object):
+        def send_message(self, **kwargs):
+            self.body = kwargs["MessageBody"]
+
+    class PollingProvider(QueueProvider):
+        scheduler = SqsScheduler(Client(), "https://sqs/queue")
+
+        def is_supported_resource_type(self):
+            return True
+
+        def create(self):
+            if self.continuation_state is None:
+                self.in_progress("started", delay=0)
+            else:
+                super(PollingProvider, self).create()
+
+    envelope = SqsEnvelope(PollingProvider)
+    body = json.dumps(cfn_request(response_server.url, "Custom::Queue", properties={"Name": "a"}))
+    assert envelope.handle(event(body), {}) == {"batchItemFailures": []}
+    assert response_server.responses == []
+
+    assert envelope.handle(event(PollingProvider.scheduler.client.body), {}) == {"batchItemFailures": []}
+    assert response_server.responses[0]["PhysicalResourceId"] == "queued-a"
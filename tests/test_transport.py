@@ -0,0 +1,79 @@
+
+import pytest
+
+from cfn_resource_provider import transport
+from cfn_resource_provider.resource_provider import ResourceProvider
+from cfn_resource_provider.transport import HttpClientTransport, RequestsTransport
+
+
+class SampleProvider(ResourceProvider):
+    def create(self):
+        self.physical_resource_id = "sample-provider-create"
+
+
+@pytest.mark.parametrize("backend", ["http.client", "requests"])
+def test_connections_are_reused(response_server, backend, cfn_request):
+    transport.configure(pool_maxsize=2, timeout=(1, 5), backend=backend)
+    try:
+        for _ in range(5):
+            response = SampleProvider().handle(cfn_request(response_server.url + "?X-Amz-Signature=abc"), {})
+            assert response["Status"] == "SUCCESS", response["Reason"]
+    finally:
+        transport.configure()
+
+    assert len(response_server.responses) == 5
+    assert response_server.responses[0]["PhysicalResourceId"] == "sample-provider-create"
+    assert response_server.connections == 1
+
+
+def test_configure_replaces_default_transport():
+    previous = transport.get_transport()
+    configured = transport.configure(pool_connections=1, pool_maxsize=1, timeout=2)
+    assert transport.get_transport() is configured
+    assert isinstance(configured, HttpClientTransport)
+    assert configured is not previous
+    assert configured.timeout == 2
+
+    assert isinstance(transport.configure(backend="requests"), RequestsTransport)
+    with pytest.raises(ValueError):
+        transport.configure(backend="urllib")
+    transport.configure()
+
+
+def test_provider_transport(response_server, cfn_request):
+    class RequestsProvider(SampleProvider):
+        response_transport = RequestsTransport()
+
+    SampleProvider().handle(cfn_request(response_server.url), {})
+    RequestsProvider().handle(cfn_request(response_server.url), {})
+    assert len(response_server.responses) == 2
+    assert response_server.connections == 2
+
+
+@pytest.mark.parametrize("transport_class", [HttpClientTransport, RequestsTransport])
+def test_close(response_server, transport_class):
+    t = transport_class()
+    r = t.put(response_server.url, b"{}", {"content-type": ""})
+    assert r.status_code == 200
+    assert r.text == ""
+    t.close()
+    assert t.put(response_server.url, b"{}", {"content-type": ""}, max_timeout=1).status_code == 200
+    assert response_server.connections == 2
+
+
+def test_pool_maxsize(response_server):
+    t = HttpClientTransport(pool_maxsize=1)
+    key = ("http", "127.0.0.1", response_server.server_address[1])
+    c1, c2 = t._connect(key, 1), t._connect(key, 1)
+    t._release(key, c1)
+    t._release(key, c2)
+    assert len(t._pools[key]) == 1
+    assert c2.sock is None, "connections beyond the pool size are closed"
+    t.close()
+
+
+def test_cap_timeout():
+    assert transport.cap_timeout((3, 30), None) == (3, 30)
+    assert transport.cap_timeout((3, 30), 5) == (3, 5)
+    assert transport.cap_timeout(10, 5) == 5
+    assert transport.cap_timeout(None, 5) == 5
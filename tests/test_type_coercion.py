@@ -0,0 +1,107 @@
+from uuid import uuid4
+
+from cfn_resource_provider.resource_provider import ResourceProvider
+from cfn_resource_provider.type_coercion import CoercionPlan, convert_property_types, plan_cache
+
+schema = {
+    "type": "object",
+    "properties": {
+        "Name": {"type": "string"},
+        "Length": {"type": "integer"},
+        "Ratio": {"type": "number"},
+        "Enabled": {"type": "boolean"},
+        "Either": {"type": ["integer", "string"]},
+        "Optional": {"type": ["integer", "null"]},
+        "Listeners": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"Port": {"type": "integer"}, "Secure": {"type": "boolean"}},
+            },
+        },
+        "Ports": {"type": "array", "items": {"type": "integer"}},
+        "Limits": {"type": "object", "additionalProperties": {"type": "number"}},
+        "Database": {"$ref": "#/definitions/connection"},
+    },
+    "definitions": {"connection": {"type": "object", "properties": {"Port": {"type": "integer"}}}},
+}
+
+
+def test_convert_declared_types():
+    properties = {
+        "Name": "0123",
+        "Length": "0123",
+        "Ratio": "1.5",
+        "Enabled": "true",
+        "Either": "42",
+        "Optional": "-1",
+        "Listeners": [{"Port": "443", "Secure": "false"}, {"Port": "80"}],
+        "Ports": ["1", "+2"],
+        "Limits": {"cpu": "0.5", "memory": "512"},
+        "Database": {"Port": "3306"},
+        "Undeclared": "12",
+    }
+    convert_property_types(properties, schema)
+    assert properties == {
+        "Name": "0123",
+        "Length": 123,
+        "Ratio": 1.5,
+        "Enabled": True,
+        "Either": "42",
+        "Optional": -1,
+        "Listeners": [{"Port": 443, "Secure": False}, {"Port": 80}],
+        "Ports": [1, 2],
+        "Limits": {"cpu": 0.5, "memory": 512},
+        "Database": {"Port": 3306},
+        "Undeclared": "12",
+    }
+
+
+def test_invalid_values_are_left_alone():
+    properties = {"Length": "12a", "Ratio": "nan", "Enabled": "yes", "Ports": ["²", "-³"], "Listeners": [1]}
+    convert_property_types(properties, schema)
+    assert properties == {"Length": "12a", "Ratio": "nan", "Enabled": "yes", "Ports": ["²", "-³"], "Listeners": [1]}
+    properties = {"Ports": "1"}
+    convert_property_types(properties, schema)
+    assert properties == {"Ports": "1"}
+
+
+def test_recursive_schema():
+    recursive = {
+        "type": "object",
+        "properties": {"Size": {"type": "integer"}, "Child": {"$ref": "#"}},
+    }
+    properties = {"Size": "1", "Child": {"Size": "2", "Child": {"Size": "3"}}}
+    convert_property_types(properties, recursive)
+    assert properties["Size"] == 1
+    assert properties["Child"]["Size"] == 2
+
+
+def test_plan_is_compiled_once():
+    assert plan_cache.get(schema) is plan_cache.get(dict(schema))
+    assert CoercionPlan({"type": "object", "properties": {"Name": {"type": "string"}}}).convert("x") == "x"
+
+
+def test_provider_schema_convert_property_types():
+    class TestProvider(ResourceProvider):
+        def __init__(self):
+            super(TestProvider, self).__init__()
+            self.request_schema = schema
+
+        def convert_property_types(self):
+            self.schema_convert_property_types(self.properties)
+
+    request = {
+        "RequestType": "Create",
+        "ResponseURL": "https://httpbin.org/put",
+        "StackId": "arn:aws:cloudformation:us-west-2:EXAMPLE/stack-name/guid",
+        "RequestId": "request-%s" % uuid4(),
+        "ResourceType": "Custom::Test",
+        "LogicalResourceId": "MyResource",
+        "ResourceProperties": {"Length": "10", "Enabled": "false"},
+    }
+    provider = TestProvider()
+    provider.set_request(request, {})
+    assert provider.is_valid_request(), provider.reason
+    assert provider.get("Length") == 10
+    assert provider.get("Enabled") is False
@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from cfn_resource_provider.async_resource_provider import AsyncResourceProvider
+from cfn_resource_provider.resource_provider import ResourceProvider
+from cfn_resource_provider.response_store import MemoryResponseStore
+
+
+class Context(object):
+    def __init__(self, remaining_millis):
+        self.deadline = time.monotonic() + remaining_millis / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+class SlowProvider(ResourceProvider):
+    timeout_margin = 0.5
+
+    def create(self):
+        self.physical_resource_id = "slow-resource"
+        time.sleep(1.0)
+        self.set_attribute("Late", "value")
+
+    def update(self):
+        time.sleep(0.1)
+
+
+def test_watchdog_sends_failed_before_deadline(response_server, cfn_request):
+    provider = SlowProvider()
+    start = time.monotonic()
+    response = provider.handle(cfn_request(response_server.url, "Custom::Slow"), Context(1000))
+
+    assert time.monotonic() - start >= 1.0
+    assert response["Status"] == "FAILED"
+    assert response["Reason"] == "Create of MyResource timed out"
+    assert response["PhysicalResourceId"] == "slow-resource"
+    assert response["Data"] == {}
+
+    assert len(response_server.responses) == 1, "the late response must not be sent"
+    assert response_server.responses[0]["Status"] == "FAILED"
+    assert provider.response["Data"] == {"Late": "value"}
+
+
+def test_watchdog_is_disarmed_after_execute(response_server, cfn_request):
+    provider = SlowProvider()
+    request = cfn_request(response_server.url, "Custom::Slow", "Update", PhysicalResourceId="slow-resource")
+    response = provider.handle(request, Context(1000))
+    assert response["Status"] == "SUCCESS", response["Reason"]
+    assert provider.watchdog is None
+    time.sleep(0.6)
+    assert len(response_server.responses) == 1
+    assert response_server.responses[0]["Status"] == "SUCCESS"
+
+
+def test_no_watchdog_without_deadline(response_server, cfn_request):
+    provider = SlowProvider()
+    provider.set_request(cfn_request(response_server.url, "Custom::Slow"), {})
+    provider.arm_watchdog()
+    assert provider.watchdog is None
+
+    provider.set_request(cfn_request(response_server.url, "Custom::Slow"), Context(100))
+    provider.arm_watchdog()
+    assert provider.watchdog is None, "not enough time left to arm the watchdog"
+
+
+def test_claim_response(cfn_request):
+    provider = SlowProvider()
+    provider.set_request(cfn_request("https://httpbin.org/put"), {})
+    assert provider.claim_response()
+    assert not provider.claim_response()
+
+
+def test_handle_waits_for_the_timed_out_response(response_server, cfn_request):
+    class RacingProvider(SlowProvider):
+        idempotency_store = MemoryResponseStore()
+
+        def is_supported_resource_type(self):
+            return True
+
+        def create(self):
+            time.sleep(0.15)
+
+        def send_response(self, response=None):
+            if response is not None:
+                time.sleep(0.3)
+            super(RacingProvider, self).send_response(response)
+
+    r = cfn_request(response_server.url, "Custom::Slow")
+    provider = RacingProvider()
+    response = provider.handle(r, Context(600))
+
+    assert response["Status"] == "FAILED"
+    assert [s["Status"] for s in response_server.responses] == ["FAILED"]
+    assert RacingProvider.idempotency_store.get(provider.idempotency_key) is None, "SUCCESS must not be recorded"
+
+
+def test_async_handle_does_not_block_the_loop_on_the_watchdog(response_server, cfn_request):
+    class AsyncRacingProvider(AsyncResourceProvider):
+        timeout_margin = 0.5
+
+        def is_supported_resource_type(self):
+            return True
+
+        async def create(self):
+            await asyncio.sleep(0.15)
+
+        def send_response(self, response=None):
+            time.sleep(0.3)
+            super(AsyncRacingProvider, self).send_response(response)
+
+    async def main():
+        ticks = []
+
+        async def tick():
+            while len(ticks) < 10:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        response, _ = await asyncio.gather(
+            AsyncRacingProvider().handle(cfn_request(response_server.url, "Custom::Slow"), Context(600)), tick()
+        )
+        return response, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    response, max_gap = asyncio.run(main())
+    assert response["Status"] == "FAILED"
+    assert [r["Status"] for r in response_server.responses] == ["FAILED"]
+    assert max_gap < 0.2, "the event loop must not wait for the watchdog"